@@ -0,0 +1,93 @@
+from device_client import DeviceClient, DeviceError
+from motion import MotionPlanner
+
+# 1 / golden ratio
+INVPHI = (5 ** 0.5 - 1) / 2
+
+
+class SwrTuner:
+    # Finds the SWR minimum in two passes: a coarse scan in one direction brackets the dip, then a
+    # golden-section search narrows the bracket. Every probe is a move, so probes are cached by position.
+    def __init__(self, coarse_step: int = 250, window: int = 2000, tolerance: int = 4, max_probes: int = 40):
+        self.coarse_step: int = coarse_step
+        self.window: int = window
+        self.tolerance: int = tolerance
+        self.max_probes: int = max_probes
+
+    def configure(self, autotune: dict):
+        self.coarse_step = int(autotune.get("coarse_step", self.coarse_step))
+        self.window = int(autotune.get("window", self.window))
+        self.tolerance = int(autotune.get("tolerance", self.tolerance))
+        self.max_probes = int(autotune.get("max_probes", self.max_probes))
+
+    @staticmethod
+    def read_swr(client: DeviceClient, status: dict) -> float:
+        # Firmware with an SWR bridge reports it in /status, older boards only in /sensor
+        if 'swr' in status:
+            return float(status['swr'])
+        sensor = client.sensor()
+        if 'swr' not in sensor:
+            raise DeviceError("Controller does not report SWR")
+        return float(sensor['swr'])
+
+    def tune(self, client: DeviceClient, planner: MotionPlanner, speed: int, center: int | None = None,
+             max_position: int = 0, on_probe=None) -> dict:
+        probes: dict[int, float] = {}
+
+        def probe(position: int) -> float:
+            if position not in probes:
+                if len(probes) >= self.max_probes:
+                    raise DeviceError(F"No SWR minimum after {self.max_probes} probes")
+                status = planner.execute(client, position, speed)
+                probes[position] = self.read_swr(client, status)
+                if on_probe is not None:
+                    on_probe({'step_count': position, 'swr': probes[position]})
+            return probes[position]
+
+        if center is None:
+            low, high = 0, max_position
+        else:
+            # A stored or temperature-corrected target can lie beyond the controller's range
+            if max_position > 0:
+                center = min(center, max_position)
+            center = max(center, 0)
+            low, high = center - self.window // 2, center + self.window // 2
+        low = max(low, 0)
+        if max_position > 0:
+            high = min(high, max_position)
+        if low > high:
+            raise DeviceError(F"Nothing to scan between {low} and {high}")
+        # Coarse pass, from the end closest to the current position, stops once the dip is behind it.
+        # Over a wide range (no center) the step grows so the scan takes at most half of max_probes,
+        # the rest is left for the fine pass.
+        coarse_step = max(self.coarse_step, -(-(high - low) // max(self.max_probes // 2, 1)))
+        current = int(client.status().get('step_count', low))
+        positions = list(range(low, high + 1, coarse_step))
+        if positions[-1] != high:
+            positions.append(high)
+        if abs(current - high) < abs(current - low):
+            positions.reverse()
+        best, rising = positions[0], 0
+        for position in positions:
+            swr = probe(position)
+            if swr < probes[best]:
+                best, rising = position, 0
+            elif swr > probes[best]:
+                rising += 1
+                if rising == 2:
+                    break
+        if len(set(probes.values())) == 1:
+            raise DeviceError(F"No SWR dip between {low} and {high}")
+        # Fine pass over the bracket around the best coarse point
+        a, b = max(best - coarse_step, low), min(best + coarse_step, high)
+        c, d = round(b - (b - a) * INVPHI), round(a + (b - a) * INVPHI)
+        while b - a > self.tolerance and c < d:
+            if probe(c) <= probe(d):
+                b, d = d, c
+                c = round(b - (b - a) * INVPHI)
+            else:
+                a, c = c, d
+                d = round(a + (b - a) * INVPHI)
+        step = min(probes, key = probes.get)
+        status = planner.execute(client, step, speed)
+        return {'step_count': step, 'swr': probes[step], 'probes': len(probes), 'status': status.get('status', "")}
@@ -0,0 +1,122 @@
+import re
+from bisect import bisect_left
+
+FREQUENCY = re.compile(r"(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?")
+
+Relays = tuple[bool, bool, bool, bool]
+
+
+def parse_frequency(text: str) -> float | None:
+    # "7.100 - 7.200 MHz" -> 7.15, "14.074" -> 14.074; band descriptions are in MHz
+    match = FREQUENCY.search(text or "")
+    if match is None:
+        return None
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    return (low + high) / 2
+
+
+class RelaySet():
+    # Calibration points measured with one relay combination, kept sorted by frequency
+    __slots__ = ("freqs", "steps")
+
+    def __init__(self):
+        self.freqs: list[float] = []
+        self.steps: list[int] = []
+
+    def add(self, freq: float, step: int):
+        i = bisect_left(self.freqs, freq)
+        if i < len(self.freqs) and self.freqs[i] == freq:
+            self.steps[i] = step
+        else:
+            self.freqs.insert(i, freq)
+            self.steps.insert(i, step)
+
+    def remove(self, freq: float):
+        i = bisect_left(self.freqs, freq)
+        if i < len(self.freqs) and self.freqs[i] == freq:
+            del self.freqs[i]
+            del self.steps[i]
+
+    def interpolate(self, freq: float) -> int:
+        # Linear between the calibrated neighbours, the nearest point just outside the calibrated range
+        i = bisect_left(self.freqs, freq)
+        if i == 0:
+            return self.steps[0]
+        if i == len(self.freqs):
+            return self.steps[-1]
+        f0, f1 = self.freqs[i - 1], self.freqs[i]
+        s0, s1 = self.steps[i - 1], self.steps[i]
+        return round(s0 + (s1 - s0) * (freq - f0) / (f1 - f0))
+
+
+class TuningTable():
+    # Frequency (MHz) -> steps lookup. Every relay combination changes the loop, so points are only
+    # interpolated with neighbours of the same combination. Frequencies further than margin (a fraction of the
+    # frequency) outside the calibrated span are refused: a value typed in kHz would otherwise tune to the
+    # highest band.
+    def __init__(self, margin: float = 0.05):
+        self.margin: float = margin
+        self.sets: dict[Relays, RelaySet] = {}
+        # All points sorted by frequency, to find which relay combination covers a frequency
+        self.index: list[tuple[float, Relays]] = []
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add(self, freq: float, step: int, relays: Relays):
+        relays = tuple(bool(r) for r in relays)
+        self.sets.setdefault(relays, RelaySet()).add(freq, step)
+        i = bisect_left(self.index, (freq, relays))
+        if i == len(self.index) or self.index[i] != (freq, relays):
+            self.index.insert(i, (freq, relays))
+
+    def remove(self, freq: float, relays: Relays):
+        relays = tuple(bool(r) for r in relays)
+        if relays in self.sets:
+            self.sets[relays].remove(freq)
+            if not self.sets[relays].freqs:
+                del self.sets[relays]
+        i = bisect_left(self.index, (freq, relays))
+        if i < len(self.index) and self.index[i] == (freq, relays):
+            del self.index[i]
+
+    def load(self, points):
+        # Bulk load from (freq, step, relays) tuples, one sort instead of an insort per point
+        self.sets.clear()
+        for freq, step, relays in sorted(points, key = lambda p: p[0]):
+            relays = tuple(bool(r) for r in relays)
+            relay_set = self.sets.setdefault(relays, RelaySet())
+            if relay_set.freqs and relay_set.freqs[-1] == freq:
+                relay_set.steps[-1] = step
+            else:
+                relay_set.freqs.append(freq)
+                relay_set.steps.append(step)
+        self.index = sorted((freq, relays) for relays, s in self.sets.items() for freq in s.freqs)
+
+    def covers(self, freq: float) -> bool:
+        if not self.index:
+            return False
+        return self.index[0][0] * (1 - self.margin) <= freq <= self.index[-1][0] * (1 + self.margin)
+
+    def relays_for(self, freq: float) -> Relays:
+        # The relay combination of the closest calibration point
+        if not self.index:
+            raise KeyError("Tuning table is empty")
+        i = bisect_left(self.index, (freq,))
+        candidates = self.index[max(i - 1, 0):i + 1]
+        return min(candidates, key = lambda p: abs(p[0] - freq))[1]
+
+    def steps_for(self, freq: float, relays: Relays | None = None) -> tuple[int, Relays]:
+        if not self.index:
+            raise KeyError("Tuning table is empty")
+        if not self.covers(freq):
+            raise KeyError(
+                F"{freq:g} MHz is outside the calibrated {self.index[0][0]:g} - {self.index[-1][0]:g} MHz"
+                )
+        if relays is None:
+            relays = self.relays_for(freq)
+        relays = tuple(bool(r) for r in relays)
+        if relays not in self.sets:
+            raise KeyError(F"No calibration points for relays {relays}")
+        return self.sets[relays].interpolate(freq), relays
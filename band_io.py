@@ -0,0 +1,140 @@
+import csv
+import json as jconf
+import struct
+from pathlib import Path
+
+FIELDS = ("band", "step", "relay1", "relay2", "relay3", "relay4", "desc")
+# Binary snapshot: magic + version, then one record per band: step, relay mask and the
+# lengths of the utf-8 name and description that follow the fixed part
+MAGIC = b"MLBT\x01"
+RECORD = struct.Struct("<iBHH")
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".mlb": "binary", ".bin": "binary"}
+TRUE = {"1", "true", "yes", "on", "+"}
+FALSE = {"0", "false", "no", "off", "-", ""}
+
+
+class BandFormatError(ValueError):
+    def __init__(self, message: str, line: int | None = None):
+        super(BandFormatError, self).__init__(F"line {line}: {message}" if line is not None else message)
+        self.line = line
+
+
+def detect_format(path) -> str:
+    fmt = FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise BandFormatError(F"Unknown band table format: {Path(path).name}")
+    return fmt
+
+
+def to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE:
+        return True
+    if text in FALSE:
+        return False
+    raise ValueError(F"not a relay state: {value!r}")
+
+
+def validate(row: dict, line: int | None = None) -> dict:
+    # Normalizes a row to the bands.json shape (step as a string, relays as bools)
+    missing = [field for field in ("band", "step") if row.get(field) is None or not str(row[field]).strip()]
+    if missing:
+        raise BandFormatError(F"missing {', '.join(missing)}", line)
+    try:
+        step = int(str(row["step"]).strip())
+    except ValueError:
+        raise BandFormatError(F"step is not an integer: {row['step']!r}", line) from None
+    if step < 0:
+        raise BandFormatError(F"step is negative: {step}", line)
+    try:
+        relays = [to_bool(row.get(F"relay{n}", False)) for n in range(1, 5)]
+    except ValueError as e:
+        raise BandFormatError(str(e), line) from None
+    return {
+        "band": str(row["band"]).strip(), "step": str(step), "relay1": relays[0], "relay2": relays[1],
+        "relay3": relays[2], "relay4": relays[3], "desc": str(row.get("desc") or "").strip()
+        }
+
+
+def read_csv(f):
+    reader = csv.DictReader(f)
+    if reader.fieldnames is None:
+        return
+    unknown = set(reader.fieldnames) - set(FIELDS)
+    if unknown:
+        raise BandFormatError(F"unknown columns: {', '.join(sorted(unknown))}", 1)
+    for row in reader:
+        yield validate(row, reader.line_num)
+
+
+def read_jsonl(f):
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            row = jconf.loads(text)
+        except ValueError as e:
+            raise BandFormatError(F"invalid JSON: {e}", line) from None
+        if not isinstance(row, dict):
+            raise BandFormatError("expected an object", line)
+        yield validate(row, line)
+
+
+def read_binary(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise BandFormatError("not a band table snapshot")
+    record = 0
+    while header := f.read(RECORD.size):
+        record += 1
+        if len(header) < RECORD.size:
+            raise BandFormatError("truncated record", record)
+        step, mask, name_len, desc_len = RECORD.unpack(header)
+        text = f.read(name_len + desc_len)
+        if len(text) < name_len + desc_len:
+            raise BandFormatError("truncated record", record)
+        yield validate({
+            "band": text[:name_len].decode("utf-8"), "step": step, "relay1": bool(mask & 1),
+            "relay2": bool(mask & 2), "relay3": bool(mask & 4), "relay4": bool(mask & 8),
+            "desc": text[name_len:].decode("utf-8")
+            }, record)
+
+
+def read_bands(path, fmt: str | None = None):
+    # Yields validated bands one at a time; nothing is kept besides the current row
+    fmt = fmt or detect_format(path)
+    if fmt == "binary":
+        with open(path, "rb") as f:
+            yield from read_binary(f)
+    else:
+        with open(path, "r", encoding = "utf-8", newline = "") as f:
+            yield from read_csv(f) if fmt == "csv" else read_jsonl(f)
+
+
+def write_bands(path, bands, fmt: str | None = None) -> int:
+    fmt = fmt or detect_format(path)
+    count = 0
+    if fmt == "binary":
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            for band in bands:
+                band = validate(band)
+                name, desc = band["band"].encode("utf-8"), band["desc"].encode("utf-8")
+                mask = sum(1 << n for n in range(4) if band[F"relay{n + 1}"])
+                f.write(RECORD.pack(int(band["step"]), mask, len(name), len(desc)) + name + desc)
+                count += 1
+        return count
+    with open(path, "w", encoding = "utf-8", newline = "") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames = FIELDS)
+            writer.writeheader()
+            for band in bands:
+                writer.writerow({key: int(value) if isinstance(value, bool) else value
+                                 for key, value in validate(band).items()})
+                count += 1
+        else:
+            for band in bands:
+                f.write(jconf.dumps(validate(band), ensure_ascii = False) + "\n")
+                count += 1
+    return count
@@ -0,0 +1,204 @@
+from array import array
+
+from PyQt6 import QtCore
+from PyQt6.QtCore import Qt
+
+
+class BandTableModel(QtCore.QAbstractTableModel):
+    # Bands are stored column by column (steps in an int array, relays as a 4-bit mask per band) and
+    # shown through self.order, the storage indexes of the visible rows after sorting and filtering.
+    BAND, STEPS, RELAY1, RELAY2, RELAY3, RELAY4, DESCRIPTION = range(7)
+    HEADERS = ("Діапазон", "Кроки", "1", "2", "3", "4", "Опис")
+    band_edited = QtCore.pyqtSignal(str, dict)
+
+    def __init__(self, parent = None):
+        super(BandTableModel, self).__init__(parent)
+        self.ids: list[str] = []
+        self.names: list[str] = []
+        self.steps = array("l")
+        self.relays = bytearray()
+        self.descs: list[str] = []
+        self.order: list[int] = []
+        self.sort_column: int = -1
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.filter_text: str = ""
+
+    def rowCount(self, parent = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.order)
+
+    def columnCount(self, parent = QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role = Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def value(self, i: int, column: int):
+        match column:
+            case self.BAND:
+                return self.names[i]
+            case self.STEPS:
+                return self.steps[i]
+            case self.DESCRIPTION:
+                return self.descs[i]
+            case _:
+                return bool(self.relays[i] & (1 << (column - self.RELAY1)))
+
+    def data(self, index, role = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return self.value(self.order[index.row()], index.column())
+        if role == Qt.ItemDataRole.UserRole:
+            return self.ids[self.order[index.row()]]
+        return None
+
+    def flags(self, index):
+        return super(BandTableModel, self).flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index, value, role = Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        i = self.order[index.row()]
+        match index.column():
+            case self.BAND:
+                self.names[i] = str(value)
+            case self.STEPS:
+                try:
+                    self.steps[i] = int(value)
+                except (TypeError, ValueError):
+                    return False
+            case self.DESCRIPTION:
+                self.descs[i] = str(value)
+            case column:
+                bit = 1 << (column - self.RELAY1)
+                self.relays[i] = self.relays[i] | bit if bool(value) else self.relays[i] & ~bit
+        self.dataChanged.emit(index, index)
+        self.band_edited.emit(self.ids[i], self.band(index.row()))
+        return True
+
+    def store(self, band_id: str, band: dict) -> int:
+        mask = sum(1 << n for n in range(4) if bool(band[F"relay{n + 1}"]))
+        self.ids.append(str(band_id))
+        self.names.append(str(band["band"]))
+        self.steps.append(int(band["step"]))
+        self.relays.append(mask)
+        self.descs.append(str(band["desc"]))
+        return len(self.ids) - 1
+
+    def load(self, bands: dict[str, dict]):
+        # Bulk load: one model reset instead of a row insert per band
+        self.beginResetModel()
+        self.ids, self.names, self.steps, self.relays, self.descs = [], [], array("l"), bytearray(), []
+        for band_id, band in bands.items():
+            self.store(band_id, band)
+        self.order = self.visible(range(len(self.ids)))
+        self.endResetModel()
+
+    def add_band(self, band_id: str, band: dict):
+        i = self.store(band_id, band)
+        # New bands show up on top, like the old insertRow(0), until the next sort
+        self.beginInsertRows(QtCore.QModelIndex(), 0, 0)
+        self.order.insert(0, i)
+        self.endInsertRows()
+
+    def add_bands(self, bands):
+        # Bulk insert of (id, band) pairs at the bottom, one rows-inserted notification for all of them
+        first = len(self.ids)
+        for band_id, band in bands:
+            self.store(band_id, band)
+        added = self.visible(range(first, len(self.ids)))
+        if not added:
+            return
+        if self.sort_column >= 0:
+            self.beginResetModel()
+            self.order = self.visible(self.order + added)
+            self.endResetModel()
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), len(self.order), len(self.order) + len(added) - 1)
+        self.order.extend(added)
+        self.endInsertRows()
+
+    def remove_band(self, row: int):
+        i = self.order[row]
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        del self.order[row]
+        for column in (self.ids, self.names, self.steps, self.relays, self.descs):
+            del column[i]
+        self.order = [j - 1 if j > i else j for j in self.order]
+        self.endRemoveRows()
+
+    def set_steps(self, band_id: str, steps: int) -> bool:
+        # By id, for a band that may have moved or been filtered out since it was picked; False when deleted
+        try:
+            i = self.ids.index(str(band_id))
+        except ValueError:
+            return False
+        self.steps[i] = int(steps)
+        if i in self.order:
+            index = self.index(self.order.index(i), self.STEPS)
+            self.dataChanged.emit(index, index)
+        self.band_edited.emit(self.ids[i], self.stored_band(i))
+        return True
+
+    def band(self, row: int) -> dict:
+        return self.stored_band(self.order[row])
+
+    def stored_band(self, i: int) -> dict:
+        mask = self.relays[i]
+        return {
+            "band": self.names[i], "step": str(self.steps[i]), "relay1": bool(mask & 1), "relay2": bool(mask & 2),
+            "relay3": bool(mask & 4), "relay4": bool(mask & 8), "desc": self.descs[i]
+            }
+
+    def band_id(self, row: int) -> str:
+        return self.ids[self.order[row]]
+
+    def find(self, name: str) -> int | None:
+        # Row of the first band called name (case-insensitive) or with that id
+        name = name.lower()
+        for row, i in enumerate(self.order):
+            if self.names[i].lower() == name or self.ids[i] == name:
+                return row
+        return None
+
+    def bands(self):
+        # Every stored band, filtered or not, as (steps, relays tuple, description)
+        for i in range(len(self.ids)):
+            mask = self.relays[i]
+            yield self.steps[i], (bool(mask & 1), bool(mask & 2), bool(mask & 4), bool(mask & 8)), self.descs[i]
+
+    def export_bands(self):
+        # Every stored band as a bands.json dict, in storage order
+        for i in range(len(self.ids)):
+            yield self.stored_band(i)
+
+    def visible(self, indexes) -> list[int]:
+        text = self.filter_text.lower()
+        if text:
+            indexes = [i for i in indexes if text in self.names[i].lower() or text in self.descs[i].lower()]
+        if self.sort_column < 0:
+            return list(indexes)
+        column = self.sort_column
+        key = self.steps.__getitem__ if column == self.STEPS else (lambda i: self.value(i, column))
+        return sorted(indexes, key = key, reverse = self.sort_order == Qt.SortOrder.DescendingOrder)
+
+    def sort(self, column: int, order = Qt.SortOrder.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        stored = [self.order[index.row()] for index in persistent]
+        self.sort_column = column
+        self.sort_order = order
+        self.order = self.visible(self.order)
+        position = {i: row for row, i in enumerate(self.order)}
+        self.changePersistentIndexList(
+            persistent, [self.index(position[i], index.column()) for i, index in zip(stored, persistent)]
+            )
+        self.layoutChanged.emit()
+
+    def set_filter(self, text: str):
+        self.beginResetModel()
+        self.filter_text = text
+        self.order = self.visible(range(len(self.ids)))
+        self.endResetModel()
@@ -0,0 +1,153 @@
+import json as jconf
+import os
+import threading
+from pathlib import Path
+
+
+class BandStore():
+    # bands.json is a snapshot, every add/edit/delete is appended to a journal right away and replayed on load.
+    # Operations carry the band id, so replaying one that is already in the snapshot is harmless.
+    # Ids are never reused: next_id in the snapshot and every id in the journal raise the high-water mark,
+    # so a band added after the highest one was deleted does not inherit its id (and its drift history).
+    def __init__(self, path: str = "bands.json", journal: str | None = None, compact_after: int = 100):
+        self.path = Path(path)
+        self.journal = Path(journal) if journal else self.path.with_suffix(".journal")
+        self.compact_after: int = compact_after
+        self.bands: dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self.journal_ops: int = 0
+        self.high_water: int = 0
+        self.compactor: threading.Thread | None = None
+
+    def read_files(self) -> tuple[dict[str, dict], int, int, int, int]:
+        # Snapshot with the journal replayed over it:
+        # (bands, next free id, ops replayed, bad lines, end of the last good line)
+        try:
+            with open(self.path, "r") as f:
+                config = jconf.load(f)
+        except FileNotFoundError:
+            config = {"bands": {}}
+        if "bands" not in config:
+            raise KeyError("Error: Key 'bands' not found in config file.")
+        bands = {str(key): band for key, band in config["bands"].items()}
+        high_water = max([int(config.get("next_id", 0))] + [self.after(key) for key in bands])
+        ops = torn = complete = 0
+        if self.journal.exists():
+            # Only lines that made it to the newline count, a crash mid-write leaves a line without one
+            with open(self.journal, "rb") as f:
+                for line in f:
+                    try:
+                        op = jconf.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        op = None
+                    if op is None:
+                        torn += 1
+                        continue
+                    self.replay(bands, op)
+                    high_water = max(high_water, self.after(op["id"]))
+                    ops += 1
+                    complete = f.tell()
+        return bands, high_water, ops, torn, complete
+
+    def read(self) -> dict[str, dict]:
+        # Read-only load for another process next to a running GUI (the command line mode): neither file is
+        # written, a compaction from here could drop an op the GUI appends meanwhile
+        return self.read_files()[0]
+
+    def load(self) -> dict[str, dict]:
+        bands, high_water, ops, torn, complete = self.read_files()
+        self.journal_ops += ops
+        # Cut a torn tail off, or the next append would be glued onto it and lost on the next load
+        if self.journal.exists() and complete < self.journal.stat().st_size:
+            os.truncate(self.journal, complete)
+        with self.lock:
+            self.bands = bands
+            self.high_water = high_water
+        if self.journal_ops or torn:
+            self.compact_in_background()
+        return dict(bands)
+
+    @staticmethod
+    def after(band_id) -> int:
+        # The first id past this one, for numeric ids
+        return int(band_id) + 1 if str(band_id).isdigit() else 0
+
+    @staticmethod
+    def replay(bands: dict, op: dict):
+        match op["op"]:
+            case "add" | "edit":
+                bands[op["id"]] = op["band"]
+            case "delete":
+                bands.pop(op["id"], None)
+
+    def append(self, *ops: dict):
+        # Several ops go out in one write and one fsync
+        with self.lock:
+            for op in ops:
+                self.replay(self.bands, op)
+                self.high_water = max(self.high_water, self.after(op["id"]))
+            with open(self.journal, "a") as f:
+                f.write("".join(jconf.dumps(op) + "\n" for op in ops))
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_ops += len(ops)
+        if self.journal_ops >= self.compact_after:
+            self.compact_in_background()
+
+    def next_id(self) -> str:
+        with self.lock:
+            return str(self.high_water)
+
+    def add(self, band: dict) -> str:
+        band_id = self.next_id()
+        self.append({"op": "add", "id": band_id, "band": band})
+        return band_id
+
+    def add_many(self, bands) -> list[str]:
+        first = int(self.next_id())
+        ops = [{"op": "add", "id": str(first + n), "band": band} for n, band in enumerate(bands)]
+        if ops:
+            self.append(*ops)
+        return [op["id"] for op in ops]
+
+    def edit(self, band_id: str, band: dict):
+        self.append({"op": "edit", "id": band_id, "band": band})
+
+    def delete(self, band_id: str):
+        self.append({"op": "delete", "id": band_id})
+
+    def compact_in_background(self):
+        if self.compactor is None or not self.compactor.is_alive():
+            self.compactor = threading.Thread(target = self.compact, name = "BandStoreCompact", daemon = True)
+            self.compactor.start()
+
+    def compact(self):
+        # Snapshot first, then drop the journal lines the snapshot covers; ops appended meanwhile are kept
+        with self.lock:
+            bands = dict(self.bands)
+            high_water = self.high_water
+            covered = self.journal.stat().st_size if self.journal.exists() else 0
+            ops = self.journal_ops
+        tmp = self.path.with_suffix(".json.tmp")
+        with open(tmp, "w") as fp:
+            jconf.dump({"bands": bands, "next_id": high_water}, fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, self.path)
+        with self.lock:
+            if not self.journal.exists():
+                return
+            with open(self.journal, "r") as f:
+                f.seek(covered)
+                rest = f.read()
+            tmp = self.journal.with_suffix(".journal.tmp")
+            with open(tmp, "w") as f:
+                f.write(rest)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.journal)
+            self.journal_ops -= ops
+
+    def close(self):
+        if self.compactor is not None:
+            self.compactor.join()
@@ -0,0 +1,110 @@
+import argparse
+import os
+import statistics
+import sys
+from pathlib import Path
+from time import perf_counter, sleep
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from device_client import DeviceClient  # noqa: E402
+from metrics import Histogram  # noqa: E402
+from mock_controller import MockController, start_in_thread  # noqa: E402
+from motion import MotionPlanner  # noqa: E402
+
+# Band positions from bands.json, visited in this order
+TARGETS = [5000, 200, 3600, 800, 4300, 1700, 0]
+
+
+def legacy_retune(url: str, current: int, target: int, speed: int):
+    # The pre-planner runButton_click: 100-step chunks, a new connection per chunk and a 0.1 s pause
+    import requests
+    direction = 0 if target > current else 1
+    for i in range(round(abs(target - current) / 100)):
+        requests.post(url + "/move", json = {'dir': direction, 'step': 100, 'speed': speed})
+        sleep(0.1)
+
+
+def planned_retune(client: DeviceClient, planner: MotionPlanner, target: int, speed: int):
+    planner.execute(client, target, speed)
+
+
+def run(name: str, controller: MockController, retune) -> dict:
+    controller.set_position(0, "idle")
+    controller.calls.clear()
+    times = []
+    for target in TARGETS:
+        start = perf_counter()
+        retune(controller.position, target)
+        times.append(perf_counter() - start)
+    return {
+        "name": name, "total": sum(times), "median": statistics.median(times), "max": max(times),
+        "requests": sum(controller.calls.values())
+        }
+
+
+def ui_responsiveness(url: str, speed: int) -> Histogram:
+    # Event loop lateness of a 10 ms timer while the worker thread retunes through all targets
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6 import QtCore, QtWidgets
+    from device_worker import DeviceWorker
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    worker = DeviceWorker(DeviceClient(url))
+    stalls = Histogram()
+    clock = QtCore.QElapsedTimer()
+    heartbeat = QtCore.QTimer()
+    heartbeat.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+    heartbeat.timeout.connect(lambda: stalls.observe(max(0, clock.restart() - heartbeat.interval())))
+    remaining = list(TARGETS)
+
+    def next_target(json: dict = None):
+        if remaining:
+            worker.goto(remaining.pop(0), speed)
+        else:
+            app.quit()
+
+    worker.arrived.connect(next_target)
+    worker.failed.connect(lambda name, message: app.quit())
+    clock.start()
+    heartbeat.start(10)
+    next_target()
+    app.exec()
+    heartbeat.stop()
+    worker.stop()
+    return stalls
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Retune benchmark against the mock controller")
+    parser.add_argument("--latency", type = float, default = 20.0, help = "mock latency per request, ms")
+    parser.add_argument("--jitter", type = float, default = 5.0, help = "mock latency jitter, ms")
+    parser.add_argument("--steps-per-second", type = float, default = 5000.0)
+    parser.add_argument("--speed", type = int, default = 15)
+    parser.add_argument("--skip-legacy", action = "store_true", help = "do not run the slow chunked baseline")
+    args = parser.parse_args()
+    controller = MockController(args.latency, args.jitter, steps_per_second = args.steps_per_second)
+    server = start_in_thread(controller)
+    url = F"http://{server.server_address[0]}:{server.server_address[1]}"
+    results = []
+    if not args.skip_legacy:
+        results.append(run("chunked (legacy)", controller, lambda current, target: legacy_retune(
+            url, current, target, args.speed)))
+    client = DeviceClient(url)
+    planner = MotionPlanner()
+    results.append(run("planned", controller, lambda current, target: planned_retune(
+        client, planner, target, args.speed)))
+    print(F"{len(TARGETS)} retunes, {args.latency:.0f}+/-{args.jitter:.0f} ms latency, "
+          F"{args.steps_per_second:.0f} steps/s")
+    for r in results:
+        print(F"{r['name']:18} total {r['total']:7.2f} s   median {r['median']:6.2f} s   "
+              F"max {r['max']:6.2f} s   requests {r['requests']:5}")
+    controller.set_position(0, "idle")
+    stalls = ui_responsiveness(url, args.speed)
+    print(F"UI event loop stall during retunes: p50 {stalls.percentile(50):.0f} ms   "
+          F"p99 {stalls.percentile(99):.0f} ms   max {stalls.max:.1f} ms")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
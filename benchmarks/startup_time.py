@@ -0,0 +1,91 @@
+import argparse
+import json as jconf
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+# The app logs to stdout as well, the result line is the one with this prefix
+MARKER = "STARTUP "
+
+
+def child():
+    # Runs inside the measured process: import the app, build the window and stop at the first paint
+    start = perf_counter()
+    sys.path.insert(0, str(ROOT))
+    import runpy
+    app_module = runpy.run_path(str(ROOT / "magloop-controller.py"), run_name = "magloop_controller")
+    from PyQt6 import QtCore, QtWidgets
+    imported = perf_counter()
+    app = QtWidgets.QApplication(sys.argv[:1])
+    theme = app_module["ThemeLoader"](app)
+    theme.precompile()
+    theme.apply("cap_control")
+    window = app_module["MainWindow"]()
+    built = perf_counter()
+
+    class FirstPaint(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Type.Paint:
+                painted = perf_counter()
+                print(MARKER + jconf.dumps({
+                    "import": (imported - start) * 1000, "construct": (built - imported) * 1000,
+                    "paint": (painted - built) * 1000
+                    }), flush = True)
+                # Skip closeEvent, it would write the config files back
+                os._exit(0)
+            return False
+
+    probe = FirstPaint()
+    window.installEventFilter(probe)
+    window.show()
+    app.exec()
+
+
+def run_once(workdir: Path) -> dict:
+    start = perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--child"], cwd = workdir, stdout = subprocess.PIPE, text = True
+        )
+    line = proc.stdout.readline()
+    while line and not line.startswith(MARKER):
+        line = proc.stdout.readline()
+    total = (perf_counter() - start) * 1000
+    proc.wait()
+    result = jconf.loads(line[len(MARKER):])
+    result["first_paint"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Measure time to first paint of the main window")
+    parser.add_argument("--runs", type = int, default = 10)
+    parser.add_argument("--child", action = "store_true", help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+    # Config files are read from the working directory, use copies pointing at a closed port
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        for name in ("bands.json", "defaults.json"):
+            shutil.copy(ROOT / name, workdir / name)
+        shutil.copytree(ROOT / "stylesheets", workdir / "stylesheets")
+        with open(ROOT / "api.json", "r") as f:
+            api = jconf.load(f)
+        api["api"]["url"] = "http://127.0.0.1:9"
+        with open(workdir / "api.json", "w") as f:
+            jconf.dump(api, f)
+        results = [run_once(workdir) for _ in range(args.runs)]
+    for key in ("import", "construct", "paint", "first_paint"):
+        values = [r[key] for r in results]
+        print(F"{key:12} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
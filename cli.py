@@ -0,0 +1,142 @@
+import argparse
+import json as jconf
+import sys
+
+from band_index import TuningTable, parse_frequency
+from band_store import BandStore
+from device_client import DeviceClient, DeviceError
+from motion import MotionPlanner
+from tracing import tracer
+
+# Any of these on the command line runs the controller headless, without importing PyQt6
+HEADLESS_OPTIONS = ("--band", "--freq", "--goto", "--relays", "--park", "--status", "--list-bands")
+
+
+def is_headless(argv: list[str]) -> bool:
+    return any(arg.split("=", 1)[0] in HEADLESS_OPTIONS for arg in argv)
+
+
+def parse_mask(text: str) -> list[bool]:
+    if len(text) != 4 or set(text) - {"0", "1"}:
+        raise argparse.ArgumentTypeError(F"expected 4 digits of 0/1, relay 1 first: {text!r}")
+    return [sw == "1" for sw in text]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog = "magloop-controller", description = "Headless control of the magnetic loop controller"
+        )
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--band", help = "tune to a stored band, by name (case-insensitive) or id")
+    target.add_argument("--freq", help = "tune to a frequency in MHz from the band table calibration")
+    target.add_argument("--goto", type = int, metavar = "STEP", help = "move to an absolute step position")
+    target.add_argument("--park", action = "store_true", help = "park the capacitor")
+    parser.add_argument("--relays", type = parse_mask, metavar = "MASK", help = "set relays, e.g. 1010")
+    parser.add_argument("--speed", type = int, help = "motor speed, default from defaults.json")
+    parser.add_argument("--status", action = "store_true", help = "print the controller status")
+    parser.add_argument("--list-bands", action = "store_true", help = "print the stored bands")
+    parser.add_argument("--json", action = "store_true", help = "print results as JSON")
+    parser.add_argument("--url", help = "controller URL, default from api.json")
+    parser.add_argument("--config", default = "api.json", help = "API config file")
+    parser.add_argument("--bands", default = "bands.json", help = "band table")
+    parser.add_argument("--trace", metavar = "FILE", help = "record device calls and moves, see tracing.py")
+    return parser
+
+
+def read_json(path: str, key: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            return jconf.load(f).get(key, {})
+    except FileNotFoundError:
+        return {}
+
+
+def find_band(bands: dict[str, dict], name: str) -> dict:
+    if name in bands:
+        return bands[name]
+    for band in bands.values():
+        if str(band.get("band", "")).lower() == name.lower():
+            return band
+    raise KeyError(F"No band {name!r}, see --list-bands")
+
+
+def report(args, result: dict):
+    if args.json:
+        print(jconf.dumps(result, ensure_ascii = False))
+        return
+    for key, value in result.items():
+        if key == "bands":
+            for band_id, band in value.items():
+                relays = "".join("1" if band[F"relay{n}"] else "0" for n in range(1, 5))
+                print(F"{band_id:>4}  {band['band']:<12} {band['step']:>6}  {relays}  {band['desc']}")
+        else:
+            print(F"{key}: {value}")
+
+
+def run(args) -> dict:
+    api = read_json(args.config, "api")
+    defaults = read_json("defaults.json", "defaults")
+    speed = args.speed if args.speed is not None else int(defaults.get("speed", 15))
+    client = DeviceClient(api = api, lightweight = True)
+    if args.url:
+        client.url = args.url
+    planner = MotionPlanner()
+    planner.configure(api.get("motion", {}))
+    result = {}
+    relays, target = args.relays, args.goto
+    if args.band or args.freq or args.list_bands:
+        bands = BandStore(args.bands).read()
+        if args.list_bands:
+            result["bands"] = bands
+        if args.band:
+            band = find_band(bands, args.band)
+            target = int(band["step"])
+            if relays is None:
+                relays = [bool(band[F"relay{n}"]) for n in range(1, 5)]
+        if args.freq:
+            freq = parse_frequency(args.freq.replace(",", "."))
+            table = TuningTable()
+            table.load(
+                (f, int(band["step"]), tuple(bool(band[F"relay{n}"]) for n in range(1, 5)))
+                for band in bands.values() if (f := parse_frequency(band.get("desc", ""))) is not None
+                )
+            if freq is None or not len(table):
+                raise KeyError(F"Cannot tune to {args.freq!r}: no calibrated bands")
+            target, table_relays = table.steps_for(freq)
+            if relays is None:
+                relays = list(table_relays)
+    try:
+        if relays is not None:
+            switched = client.relays(relays, [1, 2, 3, 4])
+            result["relays"] = "".join("1" if switched[str(n)]['status'] == "ON" else "0" for n in range(1, 5))
+        if target is not None:
+            status = planner.execute(client, target, speed)
+            result["step_count"] = status.get('step_count')
+        if args.park:
+            result.update(client.park())
+        if args.status:
+            result.update(client.status())
+    finally:
+        client.close()
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.trace:
+        tracer.enable(args.trace)
+    try:
+        result = run(args)
+    except (DeviceError, KeyError, ValueError) as e:
+        message = e.args[0] if isinstance(e, KeyError) else str(e)
+        if args.json:
+            print(jconf.dumps({"error": message}, ensure_ascii = False))
+        else:
+            print(F"Error: {message}", file = sys.stderr)
+        return 1
+    report(args, result)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
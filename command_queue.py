@@ -0,0 +1,67 @@
+import threading
+from collections import deque
+
+from motion import UP, DOWN
+
+# Requests that only read state, one queued copy is enough
+IDEMPOTENT = ("status", "sensor", "ping")
+
+
+class CommandQueue():
+    # Pending device commands, filled by the GUI thread and drained by the worker thread.
+    # Waiting commands are rewritten instead of piling up: consecutive jogs merge into one net move,
+    # a goto or park cancels the moves and gotos queued before it, repeated reads are queued once.
+    def __init__(self, max_depth: int = 8, on_cancel = None):
+        self.max_depth: int = max_depth
+        # Called with (name, args) of every command a later goto or park cancelled
+        self.on_cancel = on_cancel
+        self.commands: deque[tuple[str, tuple]] = deque()
+        self.lock = threading.Lock()
+        self.merged: int = 0
+        self.cancelled: int = 0
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.commands)
+
+    @staticmethod
+    def signed(direction: int, step) -> int:
+        return int(step) if int(direction) == UP else -int(step)
+
+    def put(self, name: str, args: tuple) -> bool:
+        # False when the command was refused because the queue is full (jogs only)
+        cancelled = []
+        with self.lock:
+            match name:
+                case "move":
+                    if self.commands and self.commands[-1][0] == "move" and self.commands[-1][1][2] == args[2]:
+                        direction, step, speed = self.commands.pop()[1]
+                        net = self.signed(direction, step) + self.signed(args[0], args[1])
+                        self.merged += 1
+                        if net:
+                            self.commands.append(("move", (UP if net > 0 else DOWN, abs(net), speed)))
+                        return True
+                    if len(self.commands) >= self.max_depth:
+                        return False
+                case "goto" | "park":
+                    kept = deque(command for command in self.commands if command[0] not in ("move", "goto"))
+                    cancelled = [command for command in self.commands if command[0] in ("move", "goto")]
+                    self.cancelled += len(cancelled)
+                    self.commands = kept
+                case _ if name in IDEMPOTENT:
+                    if (name, args) in self.commands:
+                        return True
+            self.commands.append((name, args))
+        # Outside the lock, the callback may queue the next command
+        if self.on_cancel is not None:
+            for command in cancelled:
+                self.on_cancel(*command)
+        return True
+
+    def get(self) -> tuple[str, tuple] | None:
+        with self.lock:
+            return self.commands.popleft() if self.commands else None
+
+    def full(self) -> bool:
+        with self.lock:
+            return len(self.commands) >= self.max_depth
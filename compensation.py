@@ -0,0 +1,148 @@
+import json as jconf
+import math
+import os
+import threading
+from pathlib import Path
+
+
+class TemperatureCompensation():
+    # Learns how many steps the loop drifts per degree: every stored tune is an observation
+    # (band, temperature, step) and the model is step = band intercept + slope * temperature,
+    # one slope shared by all bands. The slope only needs the per-band centered sums, kept as
+    # running totals so a new observation refits in O(1).
+    def __init__(self, path: str = "compensation.jsonl", min_spread: float = 1.0, max_correction: int = 500):
+        self.path = Path(path)
+        self.min_spread: float = min_spread
+        self.max_correction: int = max_correction
+        self.lock = threading.Lock()
+        # band id -> [n, sum t, sum s, sum t*t, sum t*s] and the temperature of its latest observation
+        self.stats: dict[str, list[float]] = {}
+        self.reference: dict[str, float] = {}
+        # band id -> how many times it was forgotten; the observations made before the n-th time are kept
+        # under "id@n", still in the slope but out of reach of corrections for that id
+        self.forgets: dict[str, int] = {}
+        self.sxx: float = 0.0
+        self.sxy: float = 0.0
+        self.loader: threading.Thread | None = None
+
+    @staticmethod
+    def centered(n: float, st: float, ss: float, stt: float, sts: float) -> tuple[float, float]:
+        return stt - st * st / n, sts - st * ss / n
+
+    def load(self):
+        # Full least squares fit over the observation log
+        import numpy as np
+        rows = []
+        try:
+            with open(self.path, "rb") as f:
+                complete = 0
+                for line in f:
+                    # A line a crash cut short is skipped, the observations after it still count
+                    if not line.endswith(b"\n"):
+                        continue
+                    try:
+                        rows.append(jconf.loads(line))
+                    except ValueError:
+                        continue
+                    complete = f.tell()
+                size = f.tell()
+            # The log is never compacted: without the cut the next observation would be appended to the fragment
+            if complete < size:
+                os.truncate(self.path, complete)
+        except FileNotFoundError:
+            pass
+        # A forget record retires the observations of its band logged before it
+        forgets: dict[str, int] = {}
+        for row in rows:
+            if row.get("forget"):
+                forgets[str(row["id"])] = forgets.get(str(row["id"]), 0) + 1
+        seen: dict[str, int] = {}
+        keys = []
+        for row in rows:
+            band_id = str(row["id"])
+            if row.get("forget"):
+                seen[band_id] = seen.get(band_id, 0) + 1
+            else:
+                generation = seen.get(band_id, 0)
+                keys.append(band_id if generation == forgets.get(band_id, 0) else F"{band_id}@{generation}")
+        rows = [row for row in rows if not row.get("forget")]
+        with self.lock:
+            self.stats.clear()
+            self.reference.clear()
+            self.forgets = forgets
+            self.sxx = self.sxy = 0.0
+            if not rows:
+                return
+            ids, bands = np.unique(keys, return_inverse = True)
+            t = np.array([row["temperature"] for row in rows], dtype = float)
+            s = np.array([row["step"] for row in rows], dtype = float)
+            # Removing each band's mean leaves only the shared slope to fit, slope = sxy / sxx
+            n = np.bincount(bands)
+            x = t - (np.bincount(bands, t) / n)[bands]
+            y = s - (np.bincount(bands, s) / n)[bands]
+            self.sxx, self.sxy = float(x @ x), float(x @ y)
+            sums = np.stack([n, np.bincount(bands, t), np.bincount(bands, s), np.bincount(bands, t * t),
+                             np.bincount(bands, t * s)], axis = 1)
+            for i, band_id in enumerate(ids):
+                self.stats[str(band_id)] = sums[i].tolist()
+            for key, row in zip(keys, rows):
+                if key == str(row["id"]):
+                    self.reference[key] = float(row["temperature"])
+
+    def load_in_background(self):
+        self.loader = threading.Thread(target = self.load, name = "CompensationFit", daemon = True)
+        self.loader.start()
+
+    def observe(self, band_id: str, temperature: float, step: int):
+        band_id = str(band_id)
+        if self.loader is not None:
+            self.loader.join()
+        with self.lock:
+            stats = self.stats.setdefault(band_id, [0.0, 0.0, 0.0, 0.0, 0.0])
+            if stats[0]:
+                sxx, sxy = self.centered(*stats)
+                self.sxx -= sxx
+                self.sxy -= sxy
+            for i, value in enumerate((1.0, temperature, step, temperature * temperature, temperature * step)):
+                stats[i] += value
+            sxx, sxy = self.centered(*stats)
+            self.sxx += sxx
+            self.sxy += sxy
+            self.reference[band_id] = temperature
+            self.append({"id": band_id, "temperature": temperature, "step": step})
+
+    def forget(self, band_id: str):
+        # A deleted band no longer has a reference temperature. Its observations move to a key of their own,
+        # the centered sums do not change with the key, so they still inform the slope. Logged, so a restart
+        # does not hand them back to the id.
+        band_id = str(band_id)
+        if self.loader is not None:
+            self.loader.join()
+        with self.lock:
+            self.reference.pop(band_id, None)
+            generation = self.forgets.get(band_id, 0)
+            if band_id in self.stats:
+                self.stats[F"{band_id}@{generation}"] = self.stats.pop(band_id)
+            self.forgets[band_id] = generation + 1
+            self.append({"id": band_id, "forget": True})
+
+    def append(self, row: dict):
+        with open(self.path, "a") as f:
+            f.write(jconf.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    @property
+    def slope(self) -> float:
+        # Steps per degree, 0 until the observations span at least min_spread degrees within some band
+        with self.lock:
+            if self.sxx < self.min_spread ** 2:
+                return 0.0
+            return self.sxy / self.sxx
+
+    def correction(self, band_id: str, temperature: float | None) -> int:
+        band_id = str(band_id)
+        if temperature is None or math.isnan(temperature) or band_id not in self.reference:
+            return 0
+        offset = round(self.slope * (temperature - self.reference[band_id]))
+        return max(-self.max_correction, min(self.max_correction, offset))
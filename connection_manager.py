@@ -0,0 +1,84 @@
+from time import monotonic
+
+from PyQt6 import QtCore
+
+from device_worker import DeviceWorker
+
+
+class ConnectionManager(QtCore.QObject):
+    # Keeps the link to one controller up. Connects through the worker, checks /settings every health_interval
+    # seconds while connected, and after a failed connect or check tries again with exponential backoff
+    # (backoff_initial, doubled per attempt up to backoff_max) until stop().
+    checked = QtCore.pyqtSignal(float)
+    retrying = QtCore.pyqtSignal(float)
+
+    def __init__(self, worker: DeviceWorker, parent = None):
+        super(ConnectionManager, self).__init__(parent)
+        self.worker = worker
+        self.url: str = ""
+        self.health_interval: float = 5.0
+        self.backoff_initial: float = 1.0
+        self.backoff_max: float = 60.0
+        self.attempts: int = 0
+        self.up_since: float | None = None
+        self.enabled: bool = False
+        self.health_Timer = QtCore.QTimer(self)
+        self.health_Timer.timeout.connect(self.check)
+        self.retry_Timer = QtCore.QTimer(self)
+        self.retry_Timer.setSingleShot(True)
+        self.retry_Timer.timeout.connect(self.connect_device)
+        self.worker.connected.connect(self.on_connected)
+        self.worker.pinged.connect(self.checked)
+        self.worker.failed.connect(self.on_failed)
+
+    def configure(self, connection: dict):
+        self.health_interval = float(connection.get("health_interval", self.health_interval))
+        self.backoff_initial = float(connection.get("backoff_initial", self.backoff_initial))
+        self.backoff_max = float(connection.get("backoff_max", self.backoff_max))
+
+    def start(self, url: str):
+        self.url = url
+        self.enabled = True
+        self.attempts = 0
+        self.retry_Timer.stop()
+        self.connect_device()
+
+    def stop(self):
+        self.enabled = False
+        self.health_Timer.stop()
+        self.retry_Timer.stop()
+
+    def connect_device(self):
+        self.worker.connect_device(self.url)
+
+    def uptime(self) -> float:
+        return monotonic() - self.up_since if self.up_since is not None else 0.0
+
+    def on_connected(self, json: dict):
+        if 'ip' not in json:
+            # Something answered, but not the controller: a wrong URL, retrying will not help
+            self.lost(retry = False)
+            return
+        self.attempts = 0
+        if self.up_since is None:
+            self.up_since = monotonic()
+        if self.health_interval > 0:
+            self.health_Timer.start(int(self.health_interval * 1000))
+
+    def check(self):
+        # Commands in flight already prove the link works, the check would only wait behind them
+        if not self.worker.depth():
+            self.worker.ping()
+
+    def on_failed(self, endpoint: str, message: str):
+        if endpoint in ("connect", "ping"):
+            self.lost()
+
+    def lost(self, retry: bool = True):
+        self.up_since = None
+        self.health_Timer.stop()
+        if retry and self.enabled and not self.retry_Timer.isActive():
+            delay = min(self.backoff_initial * 2 ** self.attempts, self.backoff_max)
+            self.attempts += 1
+            self.retry_Timer.start(int(delay * 1000))
+            self.retrying.emit(delay)
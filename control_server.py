@@ -0,0 +1,148 @@
+from time import perf_counter
+
+from PyQt6 import QtCore, QtNetwork
+
+from metrics import metrics
+
+# Minimal protocol 0 answer to \dump_state, enough for hamlib's NET rigctl backend to open the "rig":
+# one HF receive/transmit range, one tuning step and filter, no functions, levels or parameters
+DUMP_STATE = "\n".join((
+    "0", "2", "2",
+    "100000.000000 60000000.000000 0x1ff -1 -1 0x10000003 0x3", "0 0 0 0 0 0 0",
+    "100000.000000 60000000.000000 0x1ff 5000 100000 0x10000003 0x3", "0 0 0 0 0 0 0",
+    "0x1ff 1", "0 0",
+    "0x1ff 2400", "0 0",
+    "0", "0", "0", "0", "0", "0",
+    "0x0", "0x0", "0x0", "0x0", "0x0", "0x0",
+    )) + "\n"
+RPRT_OK, RPRT_EINVAL, RPRT_ENIMPL = "RPRT 0\n", "RPRT -1\n", "RPRT -4\n"
+
+
+class ControlServer(QtCore.QObject):
+    # rigctl-compatible TCP server for station software: "F 7074000" / "\set_freq 7074000" retunes the loop
+    # to a frequency in Hz, "\set_band 40m" to a stored band. Commands are answered right away; retunes are
+    # coalesced, while one is running only the latest requested target is kept and it runs next.
+    # resolve(kind, value) turns a command into a (step, relays) target or None, retune(step, relays) runs it
+    # and returns False when there is nothing to do (not connected, or the loop is already there).
+    retuned = QtCore.pyqtSignal(float)
+
+    def __init__(self, resolve, retune, parent = None):
+        super(ControlServer, self).__init__(parent)
+        self.resolve = resolve
+        self.retune = retune
+        self.server = QtNetwork.QTcpServer(self)
+        self.server.newConnection.connect(self.on_connection)
+        self.frequency: int = 0
+        self.mode: tuple[str, str] = ("USB", "2400")
+        self.pending: tuple[str, str, float] | None = None
+        self.busy: bool = False
+        # Step of the goto the running retune queued, arrivals of other gotos (GUI Tune/Run) do not end it
+        self.target: int | None = None
+        self.started: float = 0.0
+        self.coalesced: int = 0
+
+    def listen(self, host: str = "127.0.0.1", port: int = 4534) -> bool:
+        return self.server.listen(QtNetwork.QHostAddress(host), port)
+
+    def close(self):
+        self.server.close()
+
+    def on_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s = socket: self.on_ready_read(s))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket):
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).decode("ascii", "replace").strip()
+            if line:
+                reply = self.handle(line)
+                if reply is None:
+                    socket.disconnectFromHost()
+                    return
+                socket.write(reply.encode())
+
+    def handle(self, line: str) -> str | None:
+        received = perf_counter()
+        command, _, args = line.partition(" ")
+        args = args.split()
+        match command:
+            case "F" | "\\set_freq":
+                try:
+                    self.frequency = round(float(args[0]))
+                except (IndexError, ValueError):
+                    return RPRT_EINVAL
+                self.request("freq", str(self.frequency / 1e6), received)
+                return RPRT_OK
+            case "\\set_band":
+                if not args:
+                    return RPRT_EINVAL
+                self.request("band", args[0], received)
+                return RPRT_OK
+            case "f" | "\\get_freq":
+                return F"{self.frequency}\n"
+            case "M" | "\\set_mode":
+                if args:
+                    self.mode = (args[0], args[1] if len(args) > 1 else self.mode[1])
+                return RPRT_OK
+            case "m" | "\\get_mode":
+                return F"{self.mode[0]}\n{self.mode[1]}\n"
+            case "v" | "\\get_vfo":
+                return "VFOA\n"
+            case "t" | "\\get_ptt":
+                return "0\n"
+            case "V" | "\\set_vfo" | "T" | "\\set_ptt":
+                return RPRT_OK
+            case "\\chk_vfo":
+                return "0\n"
+            case "\\dump_state":
+                return DUMP_STATE
+            case "q" | "Q" | "\\quit":
+                return None
+            case _:
+                return RPRT_ENIMPL
+
+    def request(self, kind: str, value: str, received: float):
+        if self.busy:
+            if self.pending is not None:
+                self.coalesced += 1
+            # Keep the newest target but the oldest receive time, latency counts from the first request
+            self.pending = (kind, value, self.pending[2] if self.pending is not None else received)
+            return
+        self.run(kind, value, received)
+
+    def run(self, kind: str, value: str, received: float):
+        target = self.resolve(kind, value)
+        if target is None or not self.retune(*target):
+            return
+        self.busy = True
+        self.target = target[0]
+        self.started = received
+
+    def reset(self):
+        # Forget the running and the pending retune without reporting them, the target device changed
+        self.busy = False
+        self.target = None
+        self.pending = None
+
+    def on_finished(self, json: dict | None = None):
+        # Worker finished a goto (arrived) or gave up on it (failed)
+        if not self.busy or json is not None and json.get('target') != self.target:
+            return
+        self.busy = False
+        elapsed = (perf_counter() - self.started) * 1000
+        metrics.observe_retune(elapsed)
+        self.retuned.emit(elapsed)
+        if self.pending is not None:
+            pending, self.pending = self.pending, None
+            self.run(*pending)
+
+    def on_failed(self, endpoint: str, message: str):
+        if endpoint == "goto":
+            self.on_finished()
+
+    def on_cancelled(self, endpoint: str):
+        # A later goto or park dropped the queued goto, and with it the target still pending behind it
+        if endpoint == "goto":
+            self.reset()
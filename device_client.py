@@ -0,0 +1,277 @@
+import json as jconf
+import threading
+from collections import deque
+from time import perf_counter, sleep
+from urllib.parse import urlsplit
+
+from metrics import metrics
+from tracing import tracer
+
+
+class DeviceError(Exception):
+    def __init__(self, message: str, status_code: int | None = None):
+        super(DeviceError, self).__init__(message)
+        self.status_code = status_code
+
+
+class SessionPool:
+    # One requests session shared by the clients of several controllers: urllib3 keeps a pool of keep-alive
+    # connections per host, so every controller gets its own connections while they all share one session.
+    # Created by the first client that needs it, with that client's retry settings.
+    def __init__(self, hosts: int = 1):
+        self.hosts: int = hosts
+        self.lock = threading.Lock()
+        self.session = None
+
+    def get(self, client: "DeviceClient"):
+        with self.lock:
+            if self.session is None:
+                self.session = client.new_session(pool_connections = self.hosts)
+            return self.session
+
+    def close(self):
+        with self.lock:
+            if self.session is not None:
+                self.session.close()
+                self.session = None
+
+
+class DeviceClient:
+    # Blocking HTTP client for the controller. Must not be called on the GUI thread, see DeviceWorker.
+    # With lightweight=True requests go through http.client instead of requests, for short-lived
+    # processes where importing requests would cost more than the calls themselves.
+    # With a SessionPool the session is shared with the clients of other controllers, see DeviceRegistry.
+    def __init__(
+            self, url: str = "", api: dict | None = None, lightweight: bool = False, pool: SessionPool | None = None
+            ):
+        self.url: str = url
+        self.lightweight: bool = lightweight
+        self.pool = pool
+        self.api_settings: str = "/settings"
+        self.api_move: str = "/move"
+        self.api_park: str = "/park"
+        self.api_status: str = "/status"
+        self.api_relay: str = "/relay"
+        self.api_relays: str = "/relays"
+        # Cleared when the firmware has no batched relay endpoint
+        self.batch_relays: bool = True
+        self.api_sensor: str = "/sensor"
+        self.api_events: str = "/events"
+        self.connect_timeout: float = 3.05
+        self.read_timeout: float = 10.0
+        self.retry_total: int = 3
+        self.retry_backoff: float = 0.3
+        # Per-endpoint round-trip times in ms
+        self.latency: dict[str, deque] = {}
+        # Created on first request, so requests is imported by the worker thread and not at startup
+        self.session = None
+        # The open events() response, closed by close() from another thread
+        self.events_response = None
+        if api is not None:
+            self.configure(api)
+
+    def configure(self, api: dict):
+        self.url = api.get("url", self.url)
+        self.api_settings = api.get("settings", self.api_settings)
+        self.api_move = api.get("move", self.api_move)
+        self.api_park = api.get("park", self.api_park)
+        self.api_status = api.get("status", self.api_status)
+        self.api_relay = api.get("relay", self.api_relay)
+        self.api_relays = api.get("relays", self.api_relays)
+        self.api_sensor = api.get("sensor", self.api_sensor)
+        self.api_events = api.get("events", self.api_events)
+        if "timeout" in api:
+            self.connect_timeout = float(api["timeout"].get("connect", self.connect_timeout))
+            self.read_timeout = float(api["timeout"].get("read", self.read_timeout))
+        if "retry" in api:
+            self.retry_total = int(api["retry"].get("total", self.retry_total))
+            self.retry_backoff = float(api["retry"].get("backoff_factor", self.retry_backoff))
+        self.close()
+
+    def new_session(self, pool_connections: int = 1):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        # One keep-alive connection per controller is enough, its requests are serialized anyway.
+        # POST is not retried on read errors, a repeated /move would move the motor twice.
+        retry = Retry(
+            total = self.retry_total, backoff_factor = self.retry_backoff, status_forcelist = (502, 503, 504)
+            )
+        adapter = HTTPAdapter(pool_connections = pool_connections, pool_maxsize = 2, max_retries = retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def open_session(self):
+        self.session = self.pool.get(self) if self.pool is not None else self.new_session()
+
+    def open_connection(self):
+        import http.client
+        url = urlsplit(self.url)
+        connection = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.session = connection(url.hostname, url.port, timeout = self.connect_timeout)
+        self.session.connect()
+        self.session.sock.settimeout(self.read_timeout)
+
+    def request_lightweight(self, method: str, endpoint: str, json: dict | None = None) -> dict:
+        # Same retry policy as the requests session: 502/503/504 and connection errors are retried with
+        # backoff, except for POST once it has been sent
+        import http.client
+        body = jconf.dumps(json).encode() if json is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        path = urlsplit(self.url).path.rstrip("/") + endpoint
+        for attempt in range(self.retry_total + 1):
+            if attempt:
+                sleep(self.retry_backoff * 2 ** (attempt - 1))
+            sent = False
+            try:
+                if self.session is None:
+                    self.open_connection()
+                self.session.request(method, path, body = body, headers = headers)
+                sent = True
+                resp = self.session.getresponse()
+                data = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if (sent and method == "POST") or attempt == self.retry_total:
+                    raise DeviceError(F"{method} {endpoint}: {e}") from e
+                continue
+            if resp.status in (502, 503, 504) and method != "POST" and attempt < self.retry_total:
+                continue
+            if resp.status >= 400:
+                raise DeviceError(F"{method} {endpoint}: {resp.status} {resp.reason}", resp.status)
+            try:
+                return jconf.loads(data)
+            except ValueError as e:
+                raise DeviceError(F"{method} {endpoint}: invalid JSON response") from e
+
+    def request(self, method: str, endpoint: str, json: dict | None = None) -> dict:
+        start = perf_counter()
+        result, error = None, None
+        try:
+            if self.lightweight:
+                result = self.request_lightweight(method, endpoint, json)
+            else:
+                result = self.request_session(method, endpoint, json)
+            return result
+        except DeviceError as e:
+            error = str(e)
+            raise
+        finally:
+            end = perf_counter()
+            elapsed = (end - start) * 1000
+            self.latency.setdefault(endpoint, deque(maxlen = 100)).append(elapsed)
+            metrics.observe_http(endpoint, elapsed)
+            if tracer.enabled:
+                tracer.http(method, endpoint, start, end, json, result, error)
+
+    def request_session(self, method: str, endpoint: str, json: dict | None = None) -> dict:
+        import requests
+        if self.session is None:
+            self.open_session()
+        try:
+            resp = self.session.request(
+                method, self.url + endpoint, json = json, timeout = (self.connect_timeout, self.read_timeout)
+                )
+            resp.raise_for_status()
+            return resp.json()
+        except requests.exceptions.HTTPError as e:
+            raise DeviceError(F"{method} {endpoint}: {e}", e.response.status_code) from e
+        except requests.exceptions.RequestException as e:
+            raise DeviceError(F"{method} {endpoint}: {e}") from e
+        except ValueError as e:
+            raise DeviceError(F"{method} {endpoint}: invalid JSON response") from e
+
+    def events(self):
+        # Server-Sent Events stream, yields the JSON object of every "data:" line until the connection ends,
+        # and None for every keep-alive comment so the reader gets a chance to stop on an idle stream
+        import requests
+        if self.session is None:
+            self.open_session()
+        try:
+            with self.session.get(
+                    self.url + self.api_events, stream = True, timeout = (self.connect_timeout, self.read_timeout)
+                    ) as resp:
+                self.events_response = resp
+                resp.raise_for_status()
+                # Byte-wise reads: a larger chunk would hold events back until it fills up
+                for line in resp.iter_lines(chunk_size = 1, decode_unicode = True):
+                    if line and line.startswith("data:"):
+                        yield jconf.loads(line[5:])
+                    elif line and line.startswith(":"):
+                        yield None
+        except requests.exceptions.HTTPError as e:
+            raise DeviceError(F"GET {self.api_events}: {e}", e.response.status_code) from e
+        except requests.exceptions.RequestException as e:
+            raise DeviceError(F"GET {self.api_events}: {e}") from e
+        except ValueError as e:
+            raise DeviceError(F"GET {self.api_events}: invalid JSON event") from e
+        finally:
+            self.events_response = None
+
+    def close_events(self):
+        # Ends a read of events() in progress on another thread. Closing the response leaves the blocked read
+        # waiting for the next keep-alive or read_timeout, and races the reader closing it too. Shutting the
+        # socket down (urllib3 2.3+) wakes the read at once, the reader then closes the response as it leaves
+        # events().
+        resp = self.events_response
+        if resp is None:
+            return
+        try:
+            resp.raw.shutdown()
+        except (ValueError, RuntimeError, OSError):
+            # The reader already closed the response or released its connection
+            pass
+
+    def latency_report(self) -> list[str]:
+        report = []
+        for endpoint, samples in list(self.latency.items()):
+            samples = list(samples)
+            if samples:
+                report.append(
+                    F"{endpoint}: last {samples[-1]:.1f} ms, avg {sum(samples) / len(samples):.1f} ms, "
+                    F"max {max(samples):.1f} ms ({len(samples)} calls)"
+                    )
+        return report
+
+    def close(self):
+        self.close_events()
+        # A pooled session belongs to the pool, see SessionPool.close
+        if self.session is not None and self.pool is None:
+            self.session.close()
+        self.session = None
+
+    def settings(self) -> dict:
+        return self.request("GET", self.api_settings)
+
+    def status(self) -> dict:
+        return self.request("GET", self.api_status)
+
+    def move(self, direction: int, step: int, speed: int) -> dict:
+        return self.request("POST", self.api_move, json = {'dir': direction, 'step': step, 'speed': speed})
+
+    def park(self) -> dict:
+        return self.request("GET", self.api_park)
+
+    def relay(self, num: str, sw: bool) -> dict:
+        # Relay board is active low: "0" switches the relay on
+        json = {'switch': "0" if sw else "1", 'num': f'{str(num)}'}
+        return self.request("POST", self.api_relay, json = json)
+
+    def relays(self, mask: list[bool], changed: list[int]) -> dict[str, dict]:
+        # mask holds the wanted state of relays 1..4, changed the relay numbers that differ from the known state.
+        # The batched endpoint takes the whole mask, "1" switches a relay on, relay 1 first.
+        if self.batch_relays:
+            try:
+                json = self.request("POST", self.api_relays, json = {'mask': "".join("1" if sw else "0" for sw in mask)})
+                result = json.get('mask', "".join("1" if sw else "0" for sw in mask))
+                return {str(num): {'status': "ON" if result[num - 1] == "1" else "OFF"} for num in changed}
+            except DeviceError as e:
+                if e.status_code != 404:
+                    raise
+                self.batch_relays = False
+        return {str(num): self.relay(str(num), mask[num - 1]) for num in changed}
+
+    def sensor(self) -> dict:
+        return self.request("GET", self.api_sensor)
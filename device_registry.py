@@ -0,0 +1,247 @@
+from PyQt6 import QtCore
+
+from band_index import TuningTable, parse_frequency
+from band_model import BandTableModel
+from band_store import BandStore
+from compensation import TemperatureCompensation
+from connection_manager import ConnectionManager
+from device_client import DeviceClient, SessionPool
+from device_state import DeviceState
+from device_worker import DeviceWorker
+from status_stream import StatusStream
+
+
+def device_configs(api: dict) -> list[dict]:
+    # api["devices"] lists the controllers, each entry overrides the api keys it names. Without it the api
+    # section itself is the only device, with bands.json and compensation.jsonl as before.
+    base = {key: value for key, value in api.items() if key != "devices"}
+    configs = []
+    for i, device in enumerate(api.get("devices") or [{}], start = 1):
+        config = dict(base, **device)
+        config.setdefault("name", config.get("url", "") if i == 1 else F"{i}: {config.get('url', '')}")
+        config.setdefault("bands", "bands.json" if i == 1 else F"bands-{i}.json")
+        config.setdefault("compensation_log", "compensation.jsonl" if i == 1 else F"compensation-{i}.jsonl")
+        configs.append(config)
+    return configs
+
+
+class Device(QtCore.QObject):
+    # One controller and everything known about it: client and worker thread, status stream, state,
+    # band table and drift model. The device keeps its state up to date whether or not it is on screen.
+    def __init__(self, config: dict, pool: SessionPool | None = None, parent = None):
+        super(Device, self).__init__(parent)
+        self.name: str = config["name"]
+        self.url: str = config.get("url", "")
+        self.client = DeviceClient(api = config, pool = pool)
+        self.worker = DeviceWorker(self.client)
+        self.worker.thread.setObjectName(F"DeviceWorker {self.name}")
+        self.worker.planner.configure(config.get("motion", {}))
+        self.worker.tuner.configure(config.get("autotune", {}))
+        self.worker.queue.max_depth = int(config.get("queue", {}).get("max_depth", self.worker.queue.max_depth))
+        # Cached position stands in for /status for max_age seconds, read again after reconcile_interval idle
+        cache = config.get("cache", {})
+        self.worker.cache.max_age = float(cache.get("max_age", self.worker.cache.max_age))
+        self.reconcile_Timer = QtCore.QTimer(self)
+        self.reconcile_Timer.setInterval(int(float(cache.get("reconcile_interval", 30.0)) * 1000))
+        self.reconcile_Timer.timeout.connect(self.reconcile)
+        # Background connect, health checks and reconnects
+        self.link = ConnectionManager(self.worker, self)
+        self.link.configure(config.get("connection", {}))
+        self.link.checked.connect(lambda ms: self.state.update(latency = round(ms, 1)))
+        # The SSE connection stays open for as long as the stream runs, it does not come from the pool
+        self.stream = StatusStream(DeviceClient(api = config))
+        self.stream.configure(config.get("stream", {}))
+        self.state = DeviceState()
+        # Band edits are journaled as they happen
+        self.band_store = BandStore(config["bands"])
+        self.model = BandTableModel(self)
+        self.model.band_edited.connect(self.band_edited)
+        # Frequency -> steps lookup built from the band table
+        self.tuning = TuningTable()
+        # Steps per degree learned from stored tunes, applied to band targets
+        compensation = config.get("compensation", {})
+        self.compensation = TemperatureCompensation(
+            config["compensation_log"], float(compensation.get("min_spread", 1.0)),
+            int(compensation.get("max_correction", 500))
+            )
+        self.worker.connected.connect(self.on_connected)
+        self.worker.status_received.connect(self.on_status)
+        self.worker.moved.connect(self.on_moved)
+        self.worker.arrived.connect(self.on_status)
+        self.worker.parked.connect(self.on_status)
+        self.worker.tuned.connect(self.on_status)
+        self.worker.relay_switched.connect(self.on_relay_switched)
+        self.worker.failed.connect(self.on_failed)
+        self.stream.updated.connect(self.on_stream)
+
+    def load_bands(self) -> int:
+        bands = self.band_store.load()
+        self.model.load(bands)
+        self.build_tuning()
+        self.compensation.load_in_background()
+        return len(bands)
+
+    def band_edited(self, band_id: str, band: dict):
+        self.band_store.edit(band_id, band)
+        self.build_tuning()
+
+    def build_tuning(self) -> int:
+        # Band descriptions hold the frequency range, the middle of it is the calibration point
+        points = []
+        for steps, relays, desc in self.model.bands():
+            freq = parse_frequency(desc)
+            if freq is not None:
+                points.append((freq, steps, relays))
+        self.tuning.load(points)
+        return len(self.tuning)
+
+    def band_target(self, row: int, temperature: float | None = None) -> int:
+        # Stored step corrected for the temperature drift since the band was last tuned
+        step = int(self.model.band(row)['step'])
+        return step + self.compensation.correction(self.model.band_id(row), temperature)
+
+    def resolve(self, kind: str, value: str, temperature: float | None = None) -> tuple[int, tuple] | None:
+        # A frequency in MHz or a band name, to a (step, relays) target from this device's band table
+        if kind == "freq":
+            if not self.tuning.covers(float(value)):
+                return None
+            return self.tuning.steps_for(float(value))
+        row = self.model.find(value)
+        if row is None:
+            return None
+        band = self.model.band(row)
+        return self.band_target(row, temperature), (band['relay1'], band['relay2'], band['relay3'], band['relay4'])
+
+    def connect_device(self, url: str | None = None):
+        if url is not None:
+            self.url = url
+        self.link.start(self.url)
+
+    def on_connected(self, json: dict):
+        if 'ip' not in json:
+            self.state.update(connected = False)
+            return
+        self.state.update(connected = True)
+        self.apply_relays(list(self.state.relays), force = True)
+        self.worker.get_status()
+        self.stream.client.url = self.url
+        if not self.stream.isRunning():
+            self.stream.start()
+        if self.reconcile_Timer.interval() > 0:
+            self.reconcile_Timer.start()
+
+    def reconcile(self):
+        # Only when nothing the worker did lately has confirmed the position
+        if self.state.connected and not self.worker.depth() and not self.worker.cache.fresh(
+                self.reconcile_Timer.interval() / 1000):
+            self.worker.get_status()
+
+    def on_failed(self, endpoint: str, message: str):
+        if endpoint in ("connect", "ping"):
+            self.state.update(connected = False)
+            self.reconcile_Timer.stop()
+
+    def on_status(self, json: dict):
+        changes = {}
+        if 'step_count' in json:
+            changes['position'] = int(json['step_count'])
+        if 'max_position' in json:
+            changes['max_position'] = int(json['max_position'])
+        if 'status' in json:
+            changes['status'] = str(json['status'])
+        if 'swr' in json:
+            changes['swr'] = float(json['swr'])
+        self.state.update(**changes)
+
+    def on_stream(self, json: dict):
+        self.on_status(json)
+        if 'step_count' in json and json.get('status') != "moving" and not self.worker.depth():
+            self.worker.cache.check(int(json['step_count']))
+
+    def on_moved(self, json: dict):
+        if 'status' in json:
+            json = dict(json, status = F"{json['status']} кроків виконано")
+        self.on_status(json)
+
+    def set_relay(self, num: str, sw: bool):
+        self.state.set_relay(int(num), sw)
+        if self.state.connected:
+            self.worker.set_relay(num, sw)
+
+    def apply_relays(self, mask: list[bool], force: bool = False):
+        # Only relays that differ from the last known state are sent, all of them in one request
+        changed = [num for num in range(1, 5) if force or mask[num - 1] != self.state.relays[num - 1]]
+        self.state.update(relays = tuple(mask))
+        if self.state.connected and changed:
+            self.worker.set_relays(list(mask), changed)
+
+    def on_relay_switched(self, num: str, json: dict):
+        if 'status' in json:
+            self.state.set_relay_status(int(num), str(json['status']))
+
+    def retune(self, step: int, relays, speed: int) -> bool:
+        # False when there is nothing to do: not connected, or the loop is already there
+        if not self.state.connected:
+            return False
+        # Compared with where the queued commands leave the capacitor, not where it is right now
+        if step == self.worker.cache.expected_position() and tuple(relays) == self.state.relays:
+            return False
+        self.apply_relays(list(relays))
+        self.worker.goto(step, speed)
+        return True
+
+    def close(self):
+        self.link.stop()
+        self.reconcile_Timer.stop()
+        self.band_store.close()
+        self.worker.stop()
+        self.stream.stop()
+        self.client.close()
+
+
+class DeviceRegistry(QtCore.QObject):
+    # The controllers of the station by name, all sharing one HTTP connection pool. Every device has its own
+    # worker thread, so commands for different loops run in parallel; current is the one shown in the window.
+    def __init__(self, api: dict, parent = None):
+        super(DeviceRegistry, self).__init__(parent)
+        configs = device_configs(api)
+        self.pool = SessionPool(len(configs))
+        self.devices: dict[str, Device] = {}
+        for config in configs:
+            self.devices[config["name"]] = Device(config, self.pool, self)
+        self.current: Device = next(iter(self.devices.values()))
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def __getitem__(self, name: str) -> Device:
+        return self.devices[name]
+
+    def names(self) -> list[str]:
+        return list(self.devices)
+
+    def select(self, name: str) -> Device:
+        self.current = self.devices[name]
+        return self.current
+
+    def connect_all(self):
+        for device in self:
+            device.connect_device()
+
+    def retune_all(self, kind: str, value: str, speed: int, temperature: float | None = None) -> list[str]:
+        # Every connected device goes to its own target for the frequency or band, all moves run at once.
+        # Returns the names of the devices that started moving.
+        started = []
+        for device in self:
+            target = device.resolve(kind, value, temperature)
+            if target is not None and device.retune(*target, speed):
+                started.append(device.name)
+        return started
+
+    def close(self):
+        for device in self:
+            device.close()
+        self.pool.close()
@@ -0,0 +1,47 @@
+from dataclasses import dataclass, field, fields
+
+
+@dataclass(slots = True)
+class DeviceState:
+    # Single source of truth for what is known about the controller. update() only notifies listeners
+    # about fields that actually changed, with a dict of the new values.
+    connected: bool = False
+    position: int = 0
+    max_position: int = 0
+    status: str = ""
+    swr: float = 0.0
+    # Round trip of the last health check in ms, see ConnectionManager
+    latency: float = 0.0
+    relays: tuple[bool, bool, bool, bool] = (False, False, False, False)
+    relay_status: tuple[str, str, str, str] = ("OFF", "OFF", "OFF", "OFF")
+    listeners: list = field(default_factory = list, repr = False, compare = False)
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        self.listeners.remove(callback)
+
+    def update(self, **changes) -> dict:
+        diff = {}
+        for name, value in changes.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                diff[name] = value
+        if diff:
+            for callback in self.listeners:
+                callback(diff)
+        return diff
+
+    def set_relay(self, num: int, sw: bool) -> dict:
+        relays = list(self.relays)
+        relays[num - 1] = sw
+        return self.update(relays = tuple(relays))
+
+    def set_relay_status(self, num: int, status: str) -> dict:
+        relay_status = list(self.relay_status)
+        relay_status[num - 1] = status
+        return self.update(relay_status = tuple(relay_status))
+
+    def as_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "listeners"}
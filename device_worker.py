@@ -0,0 +1,142 @@
+from PyQt6 import QtCore
+
+from device_client import DeviceClient, DeviceError
+from autotune import SwrTuner
+from command_queue import CommandQueue
+from motion import MotionPlanner
+from position_cache import PositionCache
+from tracing import tracer
+
+
+class DeviceWorker(QtCore.QObject):
+    # Runs every DeviceClient call in its own QThread, results come back as signals.
+    # Requests go through a CommandQueue and are executed one by one in the order they were issued;
+    # requested only wakes the thread up.
+    requested = QtCore.pyqtSignal()
+    queue_changed = QtCore.pyqtSignal(int)
+    connected = QtCore.pyqtSignal(dict)
+    status_received = QtCore.pyqtSignal(dict)
+    moved = QtCore.pyqtSignal(dict)
+    arrived = QtCore.pyqtSignal(dict)
+    parked = QtCore.pyqtSignal(dict)
+    relay_switched = QtCore.pyqtSignal(str, dict)
+    sensor_received = QtCore.pyqtSignal(dict)
+    pinged = QtCore.pyqtSignal(float)
+    tuned = QtCore.pyqtSignal(dict)
+    failed = QtCore.pyqtSignal(str, str)
+    # A queued command dropped by a later goto or park, it will neither arrive nor fail
+    cancelled = QtCore.pyqtSignal(str)
+
+    def __init__(self, client: DeviceClient):
+        super(DeviceWorker, self).__init__()
+        self.client = client
+        self.cache = PositionCache()
+        self.planner = MotionPlanner(cache = self.cache)
+        self.tuner = SwrTuner()
+        self.queue = CommandQueue(on_cancel = lambda name, args: self.cancelled.emit(name))
+        self.busy: bool = False
+        self.thread = QtCore.QThread()
+        self.thread.setObjectName("DeviceWorker")
+        self.moveToThread(self.thread)
+        self.requested.connect(self.drain)
+        self.thread.start()
+
+    def depth(self) -> int:
+        # Waiting commands plus the one running
+        return len(self.queue) + self.busy
+
+    def submit(self, name: str, args: tuple = ()) -> bool:
+        accepted = self.queue.put(name, args)
+        if accepted:
+            self.cache.expect(name, args)
+            self.requested.emit()
+        self.queue_changed.emit(self.depth())
+        return accepted
+
+    def drain(self):
+        while (command := self.queue.get()) is not None:
+            self.busy = True
+            self.queue_changed.emit(self.depth())
+            self.dispatch(*command)
+            self.busy = False
+        self.cache.settle()
+        self.queue_changed.emit(self.depth())
+
+    def dispatch(self, name: str, args: tuple):
+        try:
+            match name:
+                case "connect":
+                    self.client.url = args[0]
+                    self.cache.invalidate()
+                    json = self.client.settings()
+                    self.cache.confirm(json)
+                    self.connected.emit(json)
+                case "ping":
+                    self.client.settings()
+                    self.pinged.emit(self.client.latency[self.client.api_settings][-1])
+                case "status":
+                    self.status_received.emit(self.planner.status(self.client))
+                case "move":
+                    json = self.client.move(*args)
+                    self.cache.confirm(json)
+                    self.moved.emit(json)
+                case "goto":
+                    json = self.planner.execute(self.client, *args, on_move = self.moved.emit)
+                    # With the requested target, so whoever queued the goto can tell its arrival from others
+                    self.arrived.emit(dict(json, target = args[0]))
+                case "park":
+                    json = self.client.park()
+                    self.cache.confirm(json)
+                    self.parked.emit(json)
+                case "relay":
+                    self.relay_switched.emit(str(args[0]), self.client.relay(*args))
+                case "relays":
+                    for num, json in self.client.relays(*args).items():
+                        self.relay_switched.emit(num, json)
+                case "sensor":
+                    self.sensor_received.emit(self.client.sensor())
+                case "autotune":
+                    with tracer.span("autotune", center = args[1]) as span:
+                        json = self.tuner.tune(self.client, self.planner, *args, on_probe = self.moved.emit)
+                        span.update(step_count = json['step_count'], probes = json['probes'])
+                    self.tuned.emit(json)
+        except DeviceError as e:
+            if name in ("move", "goto", "park", "autotune"):
+                # The motor may have stopped anywhere
+                self.cache.invalidate()
+            self.failed.emit(name, str(e))
+
+    def connect_device(self, url: str):
+        self.submit("connect", (url,))
+
+    def ping(self):
+        self.submit("ping")
+
+    def get_status(self):
+        self.submit("status")
+
+    def move(self, direction: int, step: int, speed: int) -> bool:
+        # Jogs merge with a jog still waiting in the queue, False when refused by a full queue
+        return self.submit("move", (direction, step, speed))
+
+    def goto(self, target: int, speed: int):
+        self.submit("goto", (target, speed))
+
+    def park(self):
+        self.submit("park")
+
+    def set_relay(self, num: str, sw: bool):
+        self.submit("relay", (num, sw))
+
+    def set_relays(self, mask: list[bool], changed: list[int]):
+        self.submit("relays", (mask, changed))
+
+    def get_sensor(self):
+        self.submit("sensor")
+
+    def autotune(self, speed: int, center: int | None, max_position: int):
+        self.submit("autotune", (speed, center, max_position))
+
+    def stop(self):
+        self.thread.quit()
+        self.thread.wait()
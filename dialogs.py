@@ -0,0 +1,35 @@
+from PyQt6 import QtWidgets
+
+from ui_loader import load_form
+
+Ui_Dialog = load_form("add_dialog", "Ui_Dialog")
+
+
+class AddDialog(QtWidgets.QDialog, Ui_Dialog):
+    def __init__(self):
+        super(AddDialog, self).__init__()
+        self.setupUi(self)
+        self.setWindowTitle("Додати")
+
+    def set_fields_values(self, band: str, step: int, relay1: bool, relay2: bool, relay3: bool, relay4: bool,
+                          desc: str):
+        self.bandlineEdit.setText(band)
+        self.steplineEdit.setText(step)
+        self.desclineEdit.setText(desc)
+        self.relay1checkBox.setChecked(bool(relay1))
+        self.relay2checkBox.setChecked(bool(relay2))
+        self.relay3checkBox.setChecked(bool(relay3))
+        self.relay4checkBox.setChecked(bool(relay4))
+
+    def get_fields_values(self):
+        band = self.bandlineEdit.text()
+        step = self.steplineEdit.text()
+        desc = self.desclineEdit.text()
+        relay1 = self.relay1checkBox.isChecked()
+        relay2 = self.relay2checkBox.isChecked()
+        relay3 = self.relay3checkBox.isChecked()
+        relay4 = self.relay4checkBox.isChecked()
+        return {
+            "band": band, "step": step, "relay1": relay1, "relay2": relay2, "relay3": relay3, "relay4": relay4,
+            "desc": desc
+            }
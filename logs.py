@@ -0,0 +1,52 @@
+import atexit
+import json as jconf
+import logging
+import logging.handlers
+import queue
+from datetime import datetime, timezone
+
+log = logging.getLogger("magloop")
+
+# LogRecord attributes that are not extra= fields
+RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line: time, level, logger, message, the fields passed with extra= and the traceback
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec = "milliseconds"),
+            "level": record.levelname, "logger": record.name, "thread": record.threadName,
+            "message": record.getMessage(),
+            }
+        for key, value in vars(record).items():
+            if key not in RECORD_FIELDS:
+                line[key] = value
+        if record.exc_info:
+            line["exc"] = self.formatException(record.exc_info)
+        return jconf.dumps(line, ensure_ascii = False, default = str)
+
+
+def setup(path: str | None = "magloop.log", level: str = "INFO", console: bool = True,
+          max_bytes: int = 1024 * 1024, backups: int = 3) -> logging.handlers.QueueListener:
+    # Callers only put records on a queue, formatting and writing happen in the listener thread:
+    # JSON lines into a rotating file and, with console=True, rich output on the terminal
+    handlers = []
+    if path:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes = max_bytes, backupCount = backups, encoding = "utf-8"
+            )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        from rich.logging import RichHandler
+        handlers.append(RichHandler(show_path = False))
+    records = queue.SimpleQueue()
+    log.addHandler(logging.handlers.QueueHandler(records))
+    log.setLevel(level.upper())
+    log.propagate = False
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level = True)
+    listener.start()
+    # Flushes what is still queued, also on sys.exit from the exception hook
+    atexit.register(listener.stop)
+    return listener
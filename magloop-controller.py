@@ -1,28 +1,38 @@
-import gc
+import argparse
 import json as jconf
 import sys
-from pathlib import Path
-from time import sleep
 
-import requests
+import cli
+
+if __name__ == '__main__' and cli.is_headless(sys.argv[1:]):
+    # Scripting mode: exits before PyQt6 and the GUI modules are imported
+    sys.exit(cli.main(sys.argv[1:]))
+
 from PyQt6 import QtCore
 from PyQt6 import QtWidgets
-from PyQt6.QtCore import QFile
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QStandardItemModel, QIcon
-from PyQt6.uic import loadUi
-from pympler import muppy
-from pympler import summary
-from rich.console import Console
+from PyQt6.QtGui import QIcon
+
+from band_index import parse_frequency
+from band_model import BandTableModel
+from device_client import DeviceClient
+from device_registry import DeviceRegistry
+import logs
+from logs import log
+from metrics import metrics
+from theme import ThemeLoader
+from tracing import tracer
+from ui_loader import load_form
 
 
-con = Console()
 degree_sign = u'\N{DEGREE SIGN}'
+BAND_FILES = "CSV (*.csv);;JSON Lines (*.jsonl *.ndjson);;Binary snapshot (*.mlb)"
+# Compiled from ui/ui.ui, regenerated when the .ui file changes
+Ui_MainWindow = load_form("ui", "Ui_MainWindow")
 
 
 def extended_exception_hook(exec_type, value, traceback):
-    # Print the error and traceback
-    con.log(exec_type, value, traceback)
+    # Log the error and traceback
+    log.critical("Unhandled exception", exc_info = (exec_type, value, traceback))
     # Call the normal Exception hook after
     sys._excepthook(exec_type, value, traceback)
     sys.exit(1)
@@ -37,137 +47,128 @@ class Sensor():
         self.pressure = "NaN"
 
 
-class AddDialog(QtWidgets.QDialog):
-    def __init__(self):
-        super(AddDialog, self).__init__()
-        self.desclineEdit = None
-        self.steplineEdit = None
-        self.bandlineEdit = None
-        self.relay1checkBox = None
-        self.relay2checkBox = None
-        self.relay3checkBox = None
-        self.relay4checkBox = None
-        # loadUi('add_dialog.ui', self)
-        self.load_ui()
-        self.setWindowTitle("Додати")
-        self.setStylesheet("stylesheets/cap_control.qss")
-
-    def load_ui(self):
-        path = Path(__file__).resolve().parent / "ui/add_dialog.ui"
-        ui_file = QFile(str(path))
-        ui_file.open(QFile.OpenModeFlag.ReadOnly)
-        loadUi(ui_file, self)
-        ui_file.close()
-
-    def set_fields_values(self, band: str, step: int, relay1: bool, relay2: bool, relay3: bool, relay4: bool,
-                          desc: str):
-        self.bandlineEdit.setText(band)
-        self.steplineEdit.setText(step)
-        self.desclineEdit.setText(desc)
-        self.relay1checkBox.setChecked(bool(relay1))
-        self.relay2checkBox.setChecked(bool(relay2))
-        self.relay3checkBox.setChecked(bool(relay3))
-        self.relay4checkBox.setChecked(bool(relay4))
-
-    def get_fields_values(self):
-        band = self.bandlineEdit.text()
-        step = self.steplineEdit.text()
-        desc = self.desclineEdit.text()
-        relay1 = self.relay1checkBox.isChecked()
-        relay2 = self.relay2checkBox.isChecked()
-        relay3 = self.relay3checkBox.isChecked()
-        relay4 = self.relay4checkBox.isChecked()
-        return {
-            "band": band, "step": step, "relay1": relay1, "relay2": relay2, "relay3": relay3, "relay4": relay4,
-            "desc": desc
-            }
-
-    def setStylesheet(self, filename):
-        with open(filename, "r") as fh:
-            self.setStyleSheet(fh.read())
-
-
-class MainWindow(QtWidgets.QMainWindow):
-    BAND, STEPS, RELAY1, RELAY2, RELAY3, RELAY4, DESCRIPTION = range(7)
+class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
     def __init__(self, *args, **kwargs):
         super(MainWindow, self).__init__(*args, **kwargs)
         # Load the UI Page
-        # loadUi('ui.ui', self)
-        self.load_ui()
+        self.setupUi(self)
         self.status_label = QtWidgets.QLabel("Статус: ")
+        self.swr_label = QtWidgets.QLabel("КСХ: -")
+        self.queue_label = QtWidgets.QLabel("Черга: 0")
+        self.link_label = QtWidgets.QLabel("Зв'язок: -")
         self.relay1_status_label = QtWidgets.QLabel("1:OFF")
         self.relay2_status_label = QtWidgets.QLabel("2:OFF")
         self.relay3_status_label = QtWidgets.QLabel("3:OFF")
         self.relay4_status_label = QtWidgets.QLabel("4:OFF")
+        self.statusbar.addPermanentWidget(self.link_label)
         self.statusbar.addPermanentWidget(self.status_label)
+        self.statusbar.addPermanentWidget(self.swr_label)
+        self.statusbar.addPermanentWidget(self.queue_label)
         self.statusbar.addPermanentWidget(self.relay1_status_label)
         self.statusbar.addPermanentWidget(self.relay2_status_label)
         self.statusbar.addPermanentWidget(self.relay3_status_label)
         self.statusbar.addPermanentWidget(self.relay4_status_label)
         self.statusbar.reformat()
-        self.setStylesheet("stylesheets/cap_control.qss")
         self.setWindowIcon(QIcon('ui/capacitor-logo.png'))
-        self.add_dialog = AddDialog()
+        # Created on first use, see addButton_click
+        self.add_dialog = None
         # Main Timer
         self.main_Timer = QtCore.QTimer()
         self.main_Timer.timeout.connect(self.mainTimer)
         self.main_Timer.start(60000)
-        # Sensor Timer
+        # Metrics Timer, only with --metrics: a 100 ms heartbeat, any extra delay is event loop stall time
+        self.metrics_label = QtWidgets.QLabel("")
+        self.metrics_Timer = QtCore.QTimer()
+        self.metrics_Timer.timeout.connect(self.metricsTimer)
+        self.metrics_clock = QtCore.QElapsedTimer()
+        self.metrics_ticks: int = 0
+        if metrics.enabled:
+            self.statusbar.addWidget(self.metrics_label)
+            self.metrics_clock.start()
+            self.metrics_Timer.start(100)
+        # Sensor sampler and history plot, created once connected, see start_sensors
         self.sensor = Sensor()
-        self.sensor_Timer = QtCore.QTimer()
-        self.sensor_Timer.timeout.connect(self.sensorTimer)
-        # self.sensor_Timer.start(10000)
+        self.sensor_config: dict = {}
+        self.sensor_sampler = None
+        self.sensor_plot = None
         # Variables
-        self.connected: bool = False
         self.direction = None
         self.step: int = 0
-        self.relay1: bool = False
-        self.relay2: bool = False
-        self.relay3: bool = False
-        self.relay4: bool = False
         self.speed: int = 10
-        self.current_position: int | str = 0
-        self.max_position: int | str = 0
-        self.api_status: str = ""
-        self.api_park: str = ""
-        self.api_move: str = ""
-        self.api_relay: str = ""
-        self.url: str = ""
-        self.api_sensor: str = ""
+        # Widgets are redrawn from coalesced state changes of the shown device at most once per render interval
+        self.pending_state: dict = {}
+        self.render_Timer = QtCore.QTimer()
+        self.render_Timer.setSingleShot(True)
+        self.render_Timer.setInterval(30)
+        self.render_Timer.timeout.connect(self.render_state)
+        self.api: dict = {}
+        # rigctl-compatible server for station software, see start_control_server
+        self.control_config: dict = {}
+        self.control = None
         self.autoconect: bool = False
+        # What a running autotune was started for: the id of the selected band or the entered frequency
+        self.autotune_band: str | None = None
+        self.autotune_freq: float | None = None
         self.current_treeIndex = 0
-        self.all_objects = muppy.get_objects()
+        # Controllers from api.json, each with its own worker thread, stream, state and band table.
+        # The window shows one of them, see select_device; state, client, worker, stream, band_store,
+        # model, tuning and compensation always refer to that one.
+        self.registry = None
+        self.device = None
+        self.bindings: list = []
         self.initUI()
         self.sensor_groupBox.hide()
         self.configure()
-        self.bandTreeViewConfig()
-        self.load_bandTree()
-        self.autoconnect()
-
-    def sensorTimer(self):
-        if self.connected:
-            if self.sensor_groupBox.isChecked():
-                resp = requests.get(self.url + self.api_sensor)
-                json = resp.json()
-                if 'temperature' in json:
-                    self.sensor.temperature = f"{json['temperature']}{degree_sign}"
-                    self.temperature_label.setText(self.sensor.temperature)
-                if 'humidity' in json:
-                    self.sensor.humidity = f"{json['humidity']}%"
-                    self.humidity_label.setText(self.sensor.humidity)
-                if 'pressure' in json:
-                    self.sensor.pressure = f"{json['pressure']} mmHg"
-                    self.pressure_label.setText(self.sensor.pressure)
-        else:
-            self.statusbar.showMessage("Не з'єднано")
-
-    def load_ui(self):
-        path = Path(__file__).resolve().parent / "ui/ui.ui"
-        ui_file = QFile(str(path))
-        ui_file.open(QFile.OpenModeFlag.ReadOnly)
-        loadUi(ui_file, self)
-        ui_file.close()
+        # Bands are loaded once the window is up
+        QtCore.QTimer.singleShot(0, self.load_bandTree)
+        if self.control_config.get("enabled", True):
+            self.start_control_server()
+        # Connecting waits for the window to be shown, the link is kept up in the background
+        QtCore.QTimer.singleShot(0, self.autoconnect)
+
+    def start_sensors(self):
+        if self.sensor_sampler is None:
+            from sensor_history import SensorHistory
+            from sensor_sampler import SensorSampler
+            config = self.sensor_config
+            history = SensorHistory(
+                int(config.get("capacity", 86400)), rollover = config.get("rollover") or None,
+                rollover_bytes = int(config.get("rollover_bytes", 16 * 1024 * 1024))
+                )
+            self.sensor_sampler = SensorSampler(DeviceClient(), history, float(config.get("interval", 1.0)))
+            self.sensor_sampler.client.configure(self.api)
+            self.sensor_sampler.sampled.connect(self.on_sensor)
+            self.sensor_sampler.unavailable.connect(self.on_sensor_unavailable)
+        self.sensor_sampler.client.url = self.device.url
+        if not self.sensor_sampler.isRunning():
+            self.sensor_sampler.start()
+
+    def on_sensor_unavailable(self, message: str):
+        log.info("No sensors: %s", message)
+
+    def on_sensor(self, json: dict):
+        if self.sensor_plot is None and self.sensor_sampler is not None:
+            # First sample: the controller has sensors, show them with the history plot
+            from sensor_plot import SensorPlot
+            self.sensor_plot = SensorPlot(
+                self.sensor_sampler.history, float(self.sensor_config.get("seconds_per_pixel", 10.0))
+                )
+            self.sensorLayout.addWidget(self.sensor_plot)
+            self.sensor_groupBox.setMinimumHeight(150)
+            self.sensor_groupBox.setMaximumHeight(150)
+            self.sensor_groupBox.show()
+        if self.sensor_plot is not None and self.sensor_groupBox.isChecked():
+            self.sensor_plot.refresh()
+        if 'temperature' in json:
+            self.sensor.temperature = f"{json['temperature']}{degree_sign}"
+            self.temperature_label.setText(self.sensor.temperature)
+        if 'humidity' in json:
+            self.sensor.humidity = f"{json['humidity']}%"
+            self.humidity_label.setText(self.sensor.humidity)
+        if 'pressure' in json:
+            self.sensor.pressure = f"{json['pressure']} mmHg"
+            self.pressure_label.setText(self.sensor.pressure)
 
     def initUI(self):
         self.upButton.clicked.connect(self.upButton_click)
@@ -177,130 +178,170 @@ class MainWindow(QtWidgets.QMainWindow):
         self.addButton.clicked.connect(self.addButton_click)
         self.bandtreeView.clicked.connect(self.getValue)
         self.runButton.clicked.connect(self.runButton_click)
+        self.tuneButton.clicked.connect(self.tuneButton_click)
+        self.freq_lineEdit.returnPressed.connect(self.tuneButton_click)
         self.deleteButton.clicked.connect(self.deleteButton_click)
+        self.importButton.clicked.connect(self.importButton_click)
+        self.exportButton.clicked.connect(self.exportButton_click)
+        self.autotuneButton.clicked.connect(self.autotuneButton_click)
         self.autoConCheckBox.toggled.connect(self.set_autoconnect)
+        self.deviceComboBox.currentTextChanged.connect(self.select_device)
         self.relay1checkBox.toggled.connect(self.switch_relay_1)
         self.relay2checkBox.toggled.connect(self.switch_relay_2)
         self.relay3checkBox.toggled.connect(self.switch_relay_3)
         self.relay4checkBox.toggled.connect(self.switch_relay_4)
         self.comboInit()
         self.setButtons(False)
-        con.log(F"UI Initialized")
+        log.debug("UI Initialized")
 
     def setButtons(self, state: bool) -> None:
         self.upButton.setEnabled(state)
         self.downButton.setEnabled(state)
         self.parkButton.setEnabled(state)
         self.runButton.setEnabled(state)
+        self.tuneButton.setEnabled(state)
+        self.autotuneButton.setEnabled(state)
 
     def switch_relay_1(self):
         self.set_relay("1", self.relay1checkBox.isChecked())
-        self.relay1 = self.relay1checkBox.isChecked()
 
     def switch_relay_2(self):
         self.set_relay("2", self.relay2checkBox.isChecked())
-        self.relay2 = self.relay2checkBox.isChecked()
 
     def switch_relay_3(self):
         self.set_relay("3", self.relay3checkBox.isChecked())
-        self.relay3 = self.relay3checkBox.isChecked()
 
     def switch_relay_4(self):
         self.set_relay("4", self.relay4checkBox.isChecked())
-        self.relay4 = self.relay4checkBox.isChecked()
 
     def set_relay(self, num: str, sw: bool):
-        if self.connected:
-            if sw:
-                json = {'switch': "0", 'num': f'{str(num)}'}
-                # self.relay = True
-            else:
-                json = {'switch': "1", 'num': f'{str(num)}'}
-                # self.relay = False
-            resp = requests.post(self.url + self.api_relay, json = json)
-            json = resp.json()
-            if 'status' in json:
-                # stat = json["status"]
-                match int(num):
-                    case 1:
-                        self.relay1_status_label.setText(F"1:{json['status']}")
-                    case 2:
-                        self.relay2_status_label.setText(F"2:{json['status']}")
-                    case 3:
-                        self.relay3_status_label.setText(F"3:{json['status']}")
-                    case 4:
-                        self.relay4_status_label.setText(F"4:{json['status']}")
+        self.device.set_relay(num, sw)
+
+    def apply_relays(self, mask: list[bool], force: bool = False):
+        self.device.apply_relays(mask, force)
+
+    def on_state_changed(self, diff: dict):
+        self.pending_state.update(diff)
+        if not self.render_Timer.isActive():
+            self.render_Timer.start()
+
+    def render_state(self):
+        diff, self.pending_state = self.pending_state, {}
+        if 'position' in diff:
+            self.current_position_label.setText(str(diff['position']))
+        if 'status' in diff:
+            self.status_label.setText(F"Статус: {diff['status']}")
+        if 'swr' in diff:
+            self.swr_label.setText(F"КСХ: {diff['swr']:.2f}")
+        if 'connected' in diff:
+            self.setButtons(diff['connected'])
+            if not diff['connected']:
+                self.link_label.setText("Зв'язок: -")
+        if 'latency' in diff and self.state.connected:
+            self.render_link()
+        if 'relays' in diff:
+            checkboxes = [self.relay1checkBox, self.relay2checkBox, self.relay3checkBox, self.relay4checkBox]
+            for checkbox, sw in zip(checkboxes, diff['relays']):
+                checkbox.blockSignals(True)
+                checkbox.setChecked(sw)
+                checkbox.blockSignals(False)
+        if 'relay_status' in diff:
+            labels = [self.relay1_status_label, self.relay2_status_label, self.relay3_status_label,
+                      self.relay4_status_label]
+            for num, (label, status) in enumerate(zip(labels, diff['relay_status']), start = 1):
+                label.setText(F"{num}:{status}")
+
+    def render_link(self):
+        uptime = int(self.device.link.uptime())
+        self.link_label.setText(
+            F"Зв'язок: {self.state.latency:.0f} ms, {uptime // 3600}:{uptime // 60 % 60:02d}:{uptime % 60:02d}"
+            )
+
+    def on_link_checked(self, ms: float):
+        # The uptime moves on with every health check, also when the latency is the same and the state unchanged
+        if self.state.connected:
+            self.render_link()
+
+    def bind(self, signal, slot):
+        # Connections to the shown device, dropped again when another device is selected
+        signal.connect(slot)
+        self.bindings.append((signal, slot))
+
+    def select_device(self, name: str):
+        device = self.registry.select(name)
+        if device is self.device:
+            return
+        if self.device is not None:
+            for signal, slot in self.bindings:
+                signal.disconnect(slot)
+            self.bindings.clear()
+            self.state.unsubscribe(self.on_state_changed)
+            # An autotune still running reports to the previous device, its result is not for this band table
+            self.autotune_band = self.autotune_freq = None
+        self.device = device
+        self.state, self.client, self.worker, self.stream = device.state, device.client, device.worker, device.stream
+        self.band_store, self.model, self.tuning = device.band_store, device.model, device.tuning
+        self.compensation = device.compensation
+        self.state.subscribe(self.on_state_changed)
+        self.bind(self.worker.connected, self.on_connected)
+        self.bind(self.worker.parked, self.on_parked)
+        self.bind(self.worker.sensor_received, self.on_sensor)
+        self.bind(self.worker.tuned, self.on_tuned)
+        self.bind(self.worker.queue_changed, self.on_queue_changed)
+        self.bind(self.worker.failed, self.on_failed)
+        self.bind(self.stream.mode_changed, self.on_stream_mode)
+        self.bind(self.device.link.retrying, self.on_retrying)
+        self.bind(self.device.link.checked, self.on_link_checked)
+        if self.control is not None:
+            # A remote retune still running belongs to the previous device
+            self.control.reset()
+            self.bind(self.worker.arrived, self.control.on_finished)
+            self.bind(self.worker.failed, self.control.on_failed)
+            self.bind(self.worker.cancelled, self.control.on_cancelled)
+        self.bandTreeViewConfig(self.model)
+        self.deviceComboBox.setCurrentText(device.name)
+        self.url_lineEdit.setText(device.url)
+        self.on_queue_changed(self.worker.depth())
+        # Everything shown belongs to the previous device, redraw all of it
+        self.on_state_changed(self.state.as_dict())
+        if self.sensor_sampler is not None and self.state.connected:
+            self.start_sensors()
+        log.info("Device: %s", device.name, extra = {"device": device.name})
 
     def autoconnect(self):
         self.autoconect = self.autoConCheckBox.isChecked()
         if self.autoconect:
-            self.connectButton_click()
+            self.statusbar.showMessage("З'єднання...")
+            self.registry.connect_all()
 
     def set_autoconnect(self):
         self.autoconect = self.autoConCheckBox.isChecked()
-        con.log(F"Set autoconnect: {self.autoconect}")
-
-    @staticmethod
-    def connect(url):
-        try:
-            req = requests.get(url + "/settings")
-            con.log(F"Connected")
-            return req
-        except ConnectionError:
-            con.log("Network error")
-            raise ConnectionError("Error connect to device. Check IP:PORT ")
+        log.info("Set autoconnect: %s", self.autoconect)
 
     @staticmethod
     def get_json_config(filename: str):
         try:
             with open(filename, "r") as f:
                 config = jconf.load(f)
-            con.log(F"Load Config: {filename}")
+            log.debug("Load Config: %s", filename)
             return config
         except FileNotFoundError:
             raise FileNotFoundError(F"File {filename} not found.")
 
     def load_bandTree(self):
-        config = self.get_json_config("bands.json")
-        if "bands" in config:
-            bands = config["bands"]
-            for key in bands:
-                self.addTreeItem(
-                    self.model, bands[key]['band'], bands[key]['step'], bands[key]['relay1'], bands[key]['relay2'],
-                    bands[key]['relay3'], bands[key]['relay4'], bands[key]['desc']
-                    )
-        else:
-            raise KeyError("Error: Key 'bands' not found in config file.")
-
-    def store_bandTree(self):
-        d_dict = {'bands': {}}
-        for row in range(self.model.rowCount()):
-            d_dict['bands'][row] = {}
-            for column in range(self.model.columnCount()):
-                index = self.model.index(row, column)
-                match column:
-                    case 0:
-                        d_dict['bands'][row]['band'] = str(self.model.data(index))
-                    case 1:
-                        d_dict['bands'][row]['step'] = str(self.model.data(index))
-                    case 2:
-                        d_dict['bands'][row]['relay1'] = bool(self.model.data(index))
-                    case 3:
-                        d_dict['bands'][row]['relay2'] = bool(self.model.data(index))
-                    case 4:
-                        d_dict['bands'][row]['relay3'] = bool(self.model.data(index))
-                    case 5:
-                        d_dict['bands'][row]['relay4'] = bool(self.model.data(index))
-                    case 6:
-                        d_dict['bands'][row]['desc'] = str(self.model.data(index))
-        with open("bands.json", "w") as fp:
-            jconf.dump(d_dict, fp)
+        for device in self.registry:
+            log.info("Load bands: %d (%s)", device.load_bands(), device.name, extra = {"device": device.name})
+            log.info("Tuning table: %d points", len(device.tuning), extra = {"device": device.name})
+
+    def build_tuningTable(self):
+        log.info("Tuning table: %d points", self.device.build_tuning(), extra = {"device": self.device.name})
 
     def store_defaults(self):
         defaults = {
             "defaults": {
-                "step": self.step, "speed": self.speed, "autoconnect": self.autoconect, "relay1": self.relay1,
-                "relay2": self.relay2, "relay3": self.relay3, "relay4": self.relay4
+                "step": self.step, "speed": self.speed, "autoconnect": self.autoconect,
+                "relay1": self.state.relays[0], "relay2": self.state.relays[1], "relay3": self.state.relays[2],
+                "relay4": self.state.relays[3]
                 }
             }
         defaults = jconf.dumps(defaults, indent = 4)
@@ -315,14 +356,16 @@ class MainWindow(QtWidgets.QMainWindow):
         config = self.get_json_config("api.json")
         if "api" in config:
             api = config["api"]
-            self.url = api["url"]
-            self.api_move = api["move"]
-            self.api_park = api["park"]
-            self.api_status = api["status"]
-            self.api_relay = api["relay"]
-            self.api_sensor = api["sensor"]
-            self.url_lineEdit.setText(self.url)
-            con.log(F"Loaded API config")
+            self.api = api
+            self.sensor_config = api.get("sensor_history", {})
+            self.control_config = api.get("control", {})
+            self.registry = DeviceRegistry(api, self)
+            self.deviceComboBox.addItems(self.registry.names())
+            # The device row is only shown with more than one controller
+            for widget in (self.device_label, self.deviceComboBox, self.tuneAllCheckBox):
+                widget.setVisible(len(self.registry) > 1)
+            self.select_device(self.registry.current.name)
+            log.info("Loaded API config: %d device(s)", len(self.registry))
         else:
             raise KeyError("Error: Key 'api' not found in config file.")
         defaults = self.get_json_config("defaults.json")
@@ -330,43 +373,26 @@ class MainWindow(QtWidgets.QMainWindow):
             d = defaults["defaults"]
             self.step = d["step"]
             self.speed = d["speed"]
-            self.relay1 = d["relay1"]
-            self.relay2 = d["relay2"]
-            self.relay3 = d["relay3"]
-            self.relay4 = d["relay4"]
             step_index = self.step_comboBox.findText(self.step)
             self.step_comboBox.setCurrentIndex(step_index)
             speed_index = self.speed_comboBox.findText(self.speed)
             self.speed_comboBox.setCurrentIndex(speed_index)
-            con.log(F"Autoconnect: {bool(d['autoconnect'])}")
+            log.debug("Autoconnect: %s", bool(d['autoconnect']))
             if bool(d['autoconnect']):
                 self.autoConCheckBox.setChecked(True)
-            if bool(d['relay1']):
-                self.relay1checkBox.setChecked(True)
-                self.relay1_status_label.setText(F"1: ON")
-                self.switch_relay_1()
-            if bool(d['relay2']):
-                self.relay2checkBox.setChecked(True)
-                self.relay2_status_label.setText(F"2: ON")
-                self.switch_relay_2()
-            if bool(d['relay3']):
-                self.relay3checkBox.setChecked(True)
-                self.relay3_status_label.setText(F"3: ON")
-                self.switch_relay_3()
-            if bool(d['relay4']):
-                self.relay4checkBox.setChecked(True)
-                self.relay4_status_label.setText(F"4: ON")
-                self.switch_relay_4()
-            con.log(F"Loaded defaults")
+            # Relay states are sent to the device in one request once connected
+            mask = [bool(d['relay1']), bool(d['relay2']), bool(d['relay3']), bool(d['relay4'])]
+            self.apply_relays(mask)
+            self.state.update(relay_status = tuple("ON" if sw else "OFF" for sw in mask))
+            log.debug("Loaded defaults")
         else:
             raise KeyError("Error: Key 'defaults' not found in config file.")
         self.mainTimer()
 
-    def bandTreeViewConfig(self):
+    def bandTreeViewConfig(self, model: BandTableModel):
         self.bandtreeView.setRootIsDecorated(False)
         self.bandtreeView.setAlternatingRowColors(True)
-        self.model = self.createBandTreeModel(self)
-        self.bandtreeView.setModel(self.model)
+        self.bandtreeView.setModel(model)
         self.bandtreeView.setSortingEnabled(True)
         self.bandtreeView.setColumnWidth(0, 120)
         self.bandtreeView.setColumnWidth(1, 60)
@@ -376,151 +402,259 @@ class MainWindow(QtWidgets.QMainWindow):
         self.bandtreeView.setColumnWidth(5, 45)
         self.bandtreeView.setColumnWidth(6, 120)
 
-    def createBandTreeModel(self, parent):
-        model = QStandardItemModel(0, 7, parent)
-        model.setHeaderData(self.BAND, Qt.Orientation.Horizontal, "Діапазон")
-        model.setHeaderData(self.STEPS, Qt.Orientation.Horizontal, "Кроки")
-        model.setHeaderData(self.RELAY1, Qt.Orientation.Horizontal, "1")
-        model.setHeaderData(self.RELAY2, Qt.Orientation.Horizontal, "2")
-        model.setHeaderData(self.RELAY3, Qt.Orientation.Horizontal, "3")
-        model.setHeaderData(self.RELAY4, Qt.Orientation.Horizontal, "4")
-        model.setHeaderData(self.DESCRIPTION, Qt.Orientation.Horizontal, "Опис")
-        return model
-
-    def addTreeItem(self, model, band, steps, relay1, relay2, relay3, relay4, desc):
-        model.insertRow(0)
-        model.setData(model.index(0, self.BAND), band)
-        model.setData(model.index(0, self.STEPS), steps)
-        model.setData(model.index(0, self.RELAY1), relay1)
-        model.setData(model.index(0, self.RELAY2), relay2)
-        model.setData(model.index(0, self.RELAY3), relay3)
-        model.setData(model.index(0, self.RELAY4), relay4)
-        model.setData(model.index(0, self.DESCRIPTION), desc)
-        con.log(
-            F"Added items Band: {band}, Step : {steps}, Relay1 : {relay1}, Relay2 : {relay2}, Relay3 : {relay3}, "
-            F"Relay4 : {relay4}, Description: {desc}"
+    def addTreeItem(self, model, band, steps, relay1, relay2, relay3, relay4, desc, band_id = None):
+        model.add_band(band_id, {
+            "band": band, "step": steps, "relay1": relay1, "relay2": relay2, "relay3": relay3, "relay4": relay4,
+            "desc": desc
+            })
+        log.info(
+            "Added items Band: %s, Step : %s, Relay1 : %s, Relay2 : %s, Relay3 : %s, Relay4 : %s, Description: %s",
+            band, steps, relay1, relay2, relay3, relay4, desc
             )
 
     def deleteButton_click(self):
         indices = self.bandtreeView.selectionModel().selectedRows()
-        for index in sorted(indices):
-            self.model.removeRow(index.row())
+        for index in sorted(indices, reverse = True):
+            self.band_store.delete(self.model.band_id(index.row()))
+            self.compensation.forget(self.model.band_id(index.row()))
+            self.model.remove_band(index.row())
+        self.build_tuningTable()
 
     def runButton_click(self):
-        if self.connected:
-            rows = {index.row() for index in self.bandtreeView.selectionModel().selectedIndexes()}
-            output = []
-            for row in rows:
-                row_data = []
-                for column in range(self.bandtreeView.model().columnCount()):
-                    index = self.bandtreeView.model().index(row, column)
-                    row_data.append(index.data())
-                output.append(row_data)
-            # Set Relays State
-            if bool(output[0][2]):
-                self.relay1checkBox.setChecked(True)
-                self.set_relay("1", True)
-            else:
-                self.relay1checkBox.setChecked(False)
-                self.set_relay("1", False)
-            if bool(output[0][3]):
-                self.relay2checkBox.setChecked(True)
-                self.set_relay("2", True)
-            else:
-                self.relay2checkBox.setChecked(False)
-                self.set_relay("2", False)
-            if bool(output[0][4]):
-                self.relay3checkBox.setChecked(True)
-                self.set_relay("3", True)
-            else:
-                self.relay3checkBox.setChecked(False)
-                self.set_relay("3", False)
-            if bool(output[0][5]):
-                self.relay4checkBox.setChecked(True)
-                self.set_relay("4", True)
-            else:
-                self.relay4checkBox.setChecked(False)
-                self.set_relay("4", False)
-            # Move Action
-            if self.current_position == 0:
-                con.log(f"Move from 0 to {output[0][1]}")
-                steps = round(int(output[0][1])) / 100
-                for i in range(int(steps)):
-                    self.moveTo(0, 100, self.speed)
-                    self.current_position = int(self.current_position_label.text())
-                    sleep(0.1)
-
-            elif self.current_position > int(output[0][1]):
-                difference = self.current_position - int(output[0][1])
-                con.log(f"Move from {self.current_position} to {output[0][1]}")
-                steps = round(int(difference) / 100)
-                for i in range(int(steps)):
-                    self.moveTo(1, 100, self.speed)
-                    self.current_position = int(self.current_position_label.text())
-                    sleep(0.1)
-
-            else:
-                difference = int(output[0][1]) - self.current_position
-                con.log(f"Move from {self.current_position} to {output[0][1]}")
-                steps = round(int(difference) / 100)
-                for i in range(int(steps)):
-                    self.moveTo(0, 100, self.speed)
-                    sleep(0.1)
-                    self.current_position = int(self.current_position_label.text())
+        if self.state.connected:
+            rows = sorted({index.row() for index in self.bandtreeView.selectionModel().selectedIndexes()})
+            if not rows:
+                return
+            band = self.model.band(rows[0])
+            if self.tuneAllCheckBox.isChecked():
+                # Every loop goes to its own band of the same name
+                self.retune_all("band", str(band['band']))
+                return
+            target = self.band_target(rows[0])
+            log.debug("Move from %d to %d", self.state.position, target, extra = {"device": self.device.name})
+            # Relays and move, skipped when the loop already is (or is going) there
+            if not self.retune(target, (band['relay1'], band['relay2'], band['relay3'], band['relay4'])):
+                log.debug("Already there")
+
+    def current_temperature(self) -> float | None:
+        if self.sensor_sampler is None:
+            return None
+        sample = self.sensor_sampler.history.last()
+        if sample is None or sample[1][0] != sample[1][0]:
+            # No sample yet, or the controller sent no temperature (NaN)
+            return None
+        return float(sample[1][0])
+
+    def band_target(self, row: int) -> int:
+        target = self.device.band_target(row, self.current_temperature())
+        if correction := target - int(self.model.band(row)['step']):
+            log.debug("Temperature correction: %+d steps", correction)
+        return target
+
+    def observe_tune(self, band_id: str, step):
+        # A band stored at a known temperature is a calibration point for the compensation model
+        temperature = self.current_temperature()
+        if temperature is not None and str(step).isdigit():
+            self.compensation.observe(band_id, round(temperature, 2), int(step))
+
+    def tuneButton_click(self):
+        if self.state.connected:
+            freq = parse_frequency(self.freq_lineEdit.text().replace(",", "."))
+            if freq is None:
+                self.statusbar.showMessage("Error: unknown frequency")
+                return
+            try:
+                step, relays = self.tuning.steps_for(freq)
+            except KeyError as e:
+                # Empty table or outside the calibrated range (most likely kHz typed for MHz), nothing is moved
+                log.warning("Tune: %s", e.args[0])
+                self.statusbar.showMessage(F"Error: {e.args[0]}")
+                return
+            if self.tuneAllCheckBox.isChecked():
+                self.retune_all("freq", str(freq))
+                return
+            log.debug("Tune to %s MHz: step %d, relays %s", freq, step, relays, extra = {"device": self.device.name})
+            self.retune(step, relays)
+
+    def retune_all(self, kind: str, value: str):
+        started = self.registry.retune_all(kind, value, self.speed, self.current_temperature())
+        log.info("Tune all to %s: %s", value, ", ".join(started) or "nothing to do")
+
+    def resolve_target(self, kind: str, value: str) -> tuple[int, tuple] | None:
+        # Remote control commands: a frequency in MHz or a band name, to a (step, relays) target
+        target = self.device.resolve(kind, value, self.current_temperature())
+        if target is None and kind == "band":
+            log.warning("Remote: unknown band %s", value)
+        elif target is None:
+            log.warning("Remote: %s MHz is outside the calibrated range", value)
+        return target
+
+    def retune(self, step: int, relays) -> bool:
+        return self.device.retune(step, relays, self.speed)
+
+    def start_control_server(self):
+        from control_server import ControlServer
+        self.control = ControlServer(self.resolve_target, self.retune, self)
+        self.bind(self.worker.arrived, self.control.on_finished)
+        self.bind(self.worker.failed, self.control.on_failed)
+        self.bind(self.worker.cancelled, self.control.on_cancelled)
+        self.control.retuned.connect(lambda ms: log.debug("Remote retune done in %.0f ms", ms, extra = {"ms": round(ms, 1)}))
+        host, port = self.control_config.get("host", "127.0.0.1"), int(self.control_config.get("port", 4534))
+        if self.control.listen(host, port):
+            log.info("Control server on %s:%d", host, port)
+        else:
+            log.error("Control server: %s", self.control.server.errorString())
+
+    def autotuneButton_click(self):
+        # Search around the selected band or the tuning table estimate, the whole range without either
+        if self.state.connected:
+            center = None
+            self.autotune_band = self.autotune_freq = None
+            rows = sorted({index.row() for index in self.bandtreeView.selectionModel().selectedIndexes()})
+            freq = parse_frequency(self.freq_lineEdit.text().replace(",", "."))
+            if rows:
+                band = self.model.band(rows[0])
+                self.autotune_band = self.model.band_id(rows[0])
+                center = self.band_target(rows[0])
+                self.apply_relays([band['relay1'], band['relay2'], band['relay3'], band['relay4']])
+            elif freq is not None:
+                self.autotune_freq = freq
+                # Outside the calibrated range there is no estimate, the scan covers everything
+                if self.tuning.covers(freq):
+                    center, relays = self.tuning.steps_for(freq)
+                    self.apply_relays(list(relays))
+            log.info("Autotune around %s", center if center is not None else "full range")
+            self.statusbar.showMessage("Автоналаштування...")
+            self.autotuneButton.setEnabled(False)
+            self.worker.autotune(self.speed, center, self.state.max_position)
+
+    def on_tuned(self, json: dict):
+        self.autotuneButton.setEnabled(self.state.connected)
+        log.info("Autotune: step %s, SWR %s, %s probes", json['step_count'], json['swr'], json['probes'])
+        self.statusbar.showMessage(F"КСХ {json['swr']:.2f} на {json['step_count']} кроків")
+        # The result goes into the band selected when the tune started, or a new band for the frequency
+        # entered then; the selection may have changed meanwhile
+        band_id, freq = self.autotune_band, self.autotune_freq
+        self.autotune_band = self.autotune_freq = None
+        if band_id is not None:
+            if self.model.set_steps(band_id, json['step_count']):
+                self.observe_tune(band_id, int(json['step_count']))
+        elif freq is not None:
+            values = {
+                "band": "Авто", "step": str(json['step_count']), "relay1": self.state.relays[0],
+                "relay2": self.state.relays[1], "relay3": self.state.relays[2], "relay4": self.state.relays[3],
+                "desc": F"{freq:g} MHz"
+                }
+            band_id = self.band_store.add(values)
+            self.model.add_band(band_id, values)
+            self.observe_tune(band_id, int(json['step_count']))
+            self.build_tuningTable()
 
     def getValue(self, value):
         self.current_treeIndex = value
 
     def addButton_click(self):
+        if self.add_dialog is None:
+            from dialogs import AddDialog
+            self.add_dialog = AddDialog()
         self.add_dialog.set_fields_values(
-            "Діапазон", self.current_position_label.text(), self.relay1, self.relay2, self.relay3, self.relay4, ""
+            "Діапазон", str(self.state.position), *self.state.relays, ""
             )
         answer = self.add_dialog.exec()
         if answer:
-            values = self.add_dialog.get_fields_values()
+            from band_io import BandFormatError, validate
+            try:
+                # Before anything is journaled, a step the table cannot hold would break every later load
+                values = validate(self.add_dialog.get_fields_values())
+            except BandFormatError as e:
+                log.error("Band not added: %s", e)
+                self.statusbar.showMessage(F"Error: {e}")
+                return
+            band_id = self.band_store.add(values)
             self.addTreeItem(
                 self.model, values['band'], values['step'], bool(values['relay1']), bool(values['relay2']),
-                bool(values['relay3']), bool(values['relay4']), values['desc']
+                bool(values['relay3']), bool(values['relay4']), values['desc'], band_id
                 )
+            self.observe_tune(band_id, values['step'])
+            self.build_tuningTable()
         else:
-            con.log("Cancel")
+            log.debug("Cancel")
+
+    def importButton_click(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Імпорт діапазонів", "", BAND_FILES)
+        if path:
+            self.import_bands(path)
+
+    def import_bands(self, path: str) -> int:
+        from band_io import BandFormatError, read_bands
+        try:
+            # Every row is validated before anything is journaled, a bad row imports nothing
+            bands = list(read_bands(path))
+        except (OSError, UnicodeDecodeError, BandFormatError) as e:
+            log.error("Import failed: %s", e)
+            self.statusbar.showMessage(F"Error: {e}")
+            return 0
+        ids = self.band_store.add_many(bands)
+        self.model.add_bands(zip(ids, bands))
+        self.build_tuningTable()
+        log.info("Imported %d bands from %s", len(bands), path)
+        return len(bands)
+
+    def exportButton_click(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Експорт діапазонів", "bands.csv", BAND_FILES)
+        if path:
+            self.export_bands(path)
+
+    def export_bands(self, path: str) -> int:
+        from band_io import BandFormatError, write_bands
+        try:
+            count = write_bands(path, self.model.export_bands())
+        except (OSError, BandFormatError) as e:
+            log.error("Export failed: %s", e)
+            self.statusbar.showMessage(F"Error: {e}")
+            return 0
+        log.info("Exported %d bands to %s", count, path)
+        return count
 
     def get_info(self):
-        if self.connected:
-            resp = requests.get(self.url + self.api_status)
-            json = resp.json()
-            if 'step_count' in json:
-                self.current_position_label.setText(str(json['step_count']))
-                self.current_position = int(json['step_count'])
-                self.max_position = int(json['max_position'])
-            if 'status' in json:
-                self.status_label.setText(F"Статус: {json['status']}")
+        if self.state.connected:
+            self.worker.get_status()
         else:
             self.statusbar.showMessage("Не з'єднано")
 
+    def on_stream_mode(self, mode: str):
+        log.info("Status stream: %s", mode, extra = {"device": self.device.name})
+
     def mainTimer(self):
-        gc.collect()
-        mem = gc.get_stats()
-        con.log("Garbage collect", justify = "center")
-        con.log(f"{mem}")
-        # suma = summary.summarize(self.all_objects)
-        total = summary.getsizeof(self.all_objects)
-        # summary.print_(suma)
-        con.out(F"{total} bytes")
+        for device in self.registry:
+            for line in device.client.latency_report():
+                log.info("Latency %s %s", device.name, line, extra = {"device": device.name})
+            cache = device.worker.cache
+            log.info(
+                "Position cache %s: %d /status reads saved, %d mismatches", device.name, cache.saved, cache.mismatches,
+                extra = {"device": device.name}
+                )
+        if metrics.enabled:
+            log.info("Metrics %s", metrics.summary())
+
+    def metricsTimer(self):
+        metrics.observe_stall(max(0, self.metrics_clock.restart() - self.metrics_Timer.interval()))
+        self.metrics_ticks += 1
+        if self.metrics_ticks % 10 == 0:
+            self.metrics_label.setText(metrics.summary())
+            self.metrics_label.setToolTip(metrics.dump())
 
     def moveTo(self, direction, step, speed):
-        if self.connected:
-            json = {'dir': direction, 'step': step, 'speed': speed}
-            resp = requests.post(self.url + self.api_move, json = json)
-            json = resp.json()
-            if 'step_count' in json:
-                self.current_position_label.setText(str(json['step_count']))
-            if 'status' in json:
-                self.status_label.setText(F"Статус: {json['status']} кроків виконано")
-
-    def setStylesheet(self, filename):
-        with open(filename, "r") as fh:
-            self.setStyleSheet(fh.read())
+        if self.state.connected:
+            if not self.worker.move(direction, step, speed):
+                self.statusbar.showMessage("Черга команд заповнена")
+
+    def on_queue_changed(self, depth: int):
+        self.queue_label.setText(F"Черга: {depth}")
+        # Backpressure: no more jogs until the controller catches up
+        full = self.worker.queue.full()
+        self.upButton.setEnabled(self.state.connected and not full)
+        self.downButton.setEnabled(self.state.connected and not full)
 
     def comboInit(self):
         step_items = ["10", "20", "50", "100", "200", "500"]
@@ -531,15 +665,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.speed_comboBox.currentIndexChanged.connect(self.speed_change)
 
     def parkButton_click(self):
-        if self.connected:
-            resp = requests.get(self.url + self.api_park)
-            json = resp.json()
-            if 'step_count' in json:
-                con.log(F"step_count: {json['step_count']}")
-                self.current_position_label.setText(str(json['step_count']))
-                self.current_position = int(json['step_count'])
-            if 'status' in json:
-                self.status_label.setText(F"Статус: {json['status']}")
+        if self.state.connected:
+            self.worker.park()
+
+    def on_parked(self, json: dict):
+        if 'step_count' in json:
+            log.debug("step_count: %s", json['step_count'])
 
     def upButton_click(self):
         self.moveTo(0, self.step, self.speed)
@@ -554,24 +685,46 @@ class MainWindow(QtWidgets.QMainWindow):
         self.speed = self.speed_comboBox.currentText()
 
     def connectButton_click(self):
-        self.url = self.url_lineEdit.text()
-        json = self.connect(self.url).json()
+        self.statusbar.showMessage("З'єднання...")
+        self.device.connect_device(self.url_lineEdit.text())
+
+    def on_connected(self, json: dict):
+        # Device.on_connected has already updated the state and started the stream
         if 'ip' in json:
+            log.info("Connected: %s", self.device.name, extra = {"device": self.device.name})
             self.statusbar.showMessage("З'єднано")
-            self.connected = True
-            self.setButtons(True)
-            self.get_info()
+            self.start_sensors()
         else:
             self.statusbar.showMessage("Error: No API found, check URI")
-            self.connected = False
-            self.setButtons(False)
+
+    def on_failed(self, endpoint: str, message: str):
+        log.warning("Device error: %s", message, extra = {"device": self.device.name, "endpoint": endpoint})
+        if endpoint in ("connect", "ping"):
+            # With a reconnect pending on_retrying has already said when
+            if not self.device.link.retry_Timer.isActive():
+                self.statusbar.showMessage("Error connect to device. Check IP:PORT")
+        else:
+            self.statusbar.showMessage(F"Error: {message}")
+        if endpoint == "autotune":
+            self.autotune_band = self.autotune_freq = None
+            self.autotuneButton.setEnabled(self.state.connected)
+
+    def on_retrying(self, delay: float):
+        log.warning("Reconnect in %g s", delay, extra = {"device": self.device.name})
+        self.statusbar.showMessage(F"Немає зв'язку, повтор через {delay:g} с")
 
     def closeEvent(self, event):
-        con.log("[green]Closing[/]")
+        log.info("Closing")
         self.store_defaults()
-        con.log("Storing defaults")
-        self.store_bandTree()
-        con.log("Storing bands tree")
+        log.info("Storing defaults")
+        if self.control is not None:
+            self.control.close()
+        if self.sensor_sampler is not None:
+            self.sensor_sampler.stop()
+        self.registry.close()
+        log.info("Band journals flushed")
+        if metrics.enabled:
+            print(metrics.dump())
         event.accept()
         sys.exit()
 
@@ -579,7 +732,28 @@ class MainWindow(QtWidgets.QMainWindow):
 def main():
     sys._excepthook = sys.excepthook
     sys.excepthook = extended_exception_hook
-    app = QtWidgets.QApplication(sys.argv)
+    parser = argparse.ArgumentParser(prog = "magloop-controller")
+    parser.add_argument("--metrics", action = "store_true", help = "collect runtime metrics and dump them on exit")
+    parser.add_argument("--theme", default = "cap_control", help = "stylesheet name from stylesheets/")
+    parser.add_argument("--watch-theme", action = "store_true", help = "reload the stylesheet when it changes")
+    parser.add_argument("--log-level", help = "DEBUG for every move, default from api.json")
+    parser.add_argument("--trace", metavar = "FILE", help = "record device calls and moves, see tracing.py")
+    args, qt_args = parser.parse_known_args()
+    if args.trace:
+        tracer.enable(args.trace)
+    config = cli.read_json("api.json", "api").get("logging", {})
+    logs.setup(
+        config.get("path", "magloop.log"), args.log_level or config.get("level", "INFO"),
+        bool(config.get("console", True)), int(config.get("max_bytes", 1024 * 1024)), int(config.get("backups", 3))
+        )
+    if args.metrics:
+        metrics.enable()
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    theme = ThemeLoader(app)
+    theme.precompile()
+    theme.apply(args.theme)
+    if args.watch_theme:
+        theme.watch()
     main_window = MainWindow()
     main_window.show()
     sys.exit(app.exec())
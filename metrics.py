@@ -0,0 +1,110 @@
+import gc
+import json as jconf
+import os
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the histogram buckets in ms, the last bucket catches everything slower
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram():
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        # Upper bound of the bucket holding the p-th percentile, good enough for a status panel
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(float(BUCKETS[i]), self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count, "avg": self.total / self.count if self.count else 0.0, "max": self.max,
+            "p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99)
+            }
+
+
+class Metrics():
+    # Cheap counters only: nothing here walks the heap or forces a collection
+    def __init__(self):
+        self.enabled: bool = False
+        self.lock = threading.Lock()
+        self.http: dict[str, Histogram] = {}
+        self.stall = Histogram()
+        # Remote retune requests, from the command arriving to the loop settling
+        self.retune = Histogram()
+
+    def enable(self):
+        self.enabled = True
+
+    def observe_http(self, endpoint: str, ms: float):
+        if self.enabled:
+            with self.lock:
+                self.http.setdefault(endpoint, Histogram()).observe(ms)
+
+    def observe_stall(self, ms: float):
+        if self.enabled:
+            with self.lock:
+                self.stall.observe(ms)
+
+    @staticmethod
+    def rss() -> int:
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, AttributeError):
+            pass
+        try:
+            import resource
+            # Peak RSS, KiB on Linux, bytes on macOS
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except ImportError:
+            return 0
+
+    def observe_retune(self, ms: float):
+        if self.enabled:
+            with self.lock:
+                self.retune.observe(ms)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            http = {endpoint: h.as_dict() for endpoint, h in self.http.items()}
+            stall = self.stall.as_dict()
+            retune = self.retune.as_dict()
+        return {
+            "rss": self.rss(), "gc_count": list(gc.get_count()), "stall": stall, "retune": retune, "http": http
+            }
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        text = F"RSS {snap['rss'] / 1048576:.0f} MB | GC {'/'.join(map(str, snap['gc_count']))} | " \
+               F"stall {snap['stall']['max']:.0f} ms"
+        if snap["retune"]["count"]:
+            text += F" | retune p95 {snap['retune']['p95']:.0f} ms"
+        for endpoint, h in snap["http"].items():
+            text += F" | {endpoint} p95 {h['p95']:.0f} ms"
+        return text
+
+    def dump(self) -> str:
+        return jconf.dumps(self.snapshot(), indent = 4)
+
+
+metrics = Metrics()
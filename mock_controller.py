@@ -0,0 +1,202 @@
+import argparse
+import json as jconf
+import random
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+
+
+class MockController():
+    # Stand-in for the loop controller firmware, with configurable network and stepper behaviour
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, fail_rate: float = 0.0,
+                 steps_per_second: float = 2000.0, max_position: int = 10000, batch_relays: bool = True,
+                 events: bool = True, resonance: int | None = None, bandwidth: float = 150.0):
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.fail_rate: float = fail_rate
+        self.steps_per_second: float = steps_per_second
+        self.max_position: int = max_position
+        self.batch_relays: bool = batch_relays
+        self.events: bool = events
+        # SWR follows the loop resonance: 1.0 at resonance, growing quadratically, clipped at 10
+        self.resonance: int = max_position * 2 // 5 if resonance is None else resonance
+        self.bandwidth: float = bandwidth
+        self.lock = threading.Condition()
+        self.position: int = 0
+        self.status: str = "idle"
+        self.relays: list[bool] = [False, False, False, False]
+        self.calls: Counter = Counter()
+
+    def delay(self):
+        sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)) / 1000)
+
+    def should_fail(self) -> bool:
+        return random.random() < self.fail_rate
+
+    def swr(self, position: int) -> float:
+        return round(min(1.0 + ((position - self.resonance) / self.bandwidth) ** 2, 10.0), 2)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                'step_count': self.position, 'max_position': self.max_position, 'status': self.status,
+                'swr': self.swr(self.position)
+                }
+
+    def set_position(self, position: int, status: str):
+        with self.lock:
+            self.position = position
+            self.status = status
+            self.lock.notify_all()
+
+    def move(self, direction: int, step: int) -> dict:
+        # Blocks like the firmware does, the position advances in 10 ms ticks so /events can report the travel
+        sign = 1 if direction == 0 else -1
+        start = self.position
+        target = min(max(start + sign * step, 0), self.max_position)
+        began = monotonic()
+        duration = abs(target - start) / self.steps_per_second
+        self.set_position(start, "moving")
+        while monotonic() - began < duration:
+            sleep(0.01)
+            done = int((monotonic() - began) * self.steps_per_second)
+            self.set_position(start + sign * min(done, abs(target - start)), "moving")
+        self.set_position(target, "idle")
+        return {'step_count': target, 'status': str(abs(target - start))}
+
+    def relay(self, num: int, sw: bool) -> str:
+        with self.lock:
+            self.relays[num - 1] = sw
+        return "ON" if sw else "OFF"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes, with Nagle on every keep-alive reply waits for the
+    # client's delayed ACK (about 40 ms) on top of the configured latency
+    disable_nagle_algorithm = True
+    controller: MockController = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data: dict, code: int = 200):
+        body = jconf.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return jconf.loads(self.rfile.read(length) or b"{}")
+
+    def handle_request(self, method: str):
+        ctl = self.controller
+        ctl.calls[self.path] += 1
+        json = self.read_json() if method == "POST" else {}
+        if self.path == "/events" and ctl.events:
+            self.stream_events()
+            return
+        ctl.delay()
+        if ctl.should_fail():
+            self.send_json({'error': "injected failure"}, 503)
+            return
+        match method, self.path:
+            case "GET", "/settings":
+                self.send_json({'ip': self.server.server_address[0], 'max_position': ctl.max_position})
+            case "GET", "/status":
+                self.send_json(ctl.snapshot())
+            case "GET", "/park":
+                ctl.move(1, ctl.position)
+                self.send_json({'step_count': ctl.position, 'status': "parked"})
+            case "POST", "/move":
+                self.send_json(ctl.move(int(json['dir']), int(json['step'])))
+            case "POST", "/relay":
+                # Active low, like the real relay board
+                self.send_json({'status': ctl.relay(int(json['num']), json['switch'] == "0")})
+            case "POST", "/relays" if ctl.batch_relays:
+                for num, sw in enumerate(json['mask'], start = 1):
+                    ctl.relay(num, sw == "1")
+                self.send_json({'mask': json['mask']})
+            case "GET", "/sensor":
+                self.send_json({
+                    'temperature': round(21 + random.uniform(-0.5, 0.5), 1), 'humidity': 45, 'pressure': 748,
+                    'swr': ctl.swr(ctl.position)
+                    })
+            case _:
+                self.send_json({'error': "not found"}, 404)
+
+    def stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.close_connection = True
+        last = None
+        try:
+            while True:
+                event = self.controller.snapshot()
+                if event != last:
+                    self.wfile.write(F"data: {jconf.dumps(event)}\n\n".encode())
+                    self.wfile.flush()
+                    last = event
+                with self.controller.lock:
+                    if not self.controller.lock.wait(5.0):
+                        # Keep-alive comment, stops clients from timing out on an idle motor
+                        self.wfile.write(b": ping\n\n")
+                        self.wfile.flush()
+        except OSError:
+            pass
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+
+def serve(controller: MockController, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    handler = type("BoundMockHandler", (MockHandler,), {"controller": controller})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(controller: MockController, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    # Port 0 picks a free port, the URL is http://{server.server_address[0]}:{server.server_address[1]}
+    server = serve(controller, host, port)
+    threading.Thread(target = server.serve_forever, name = "MockController", daemon = True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Mock magnetic loop controller for offline testing")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8080)
+    parser.add_argument("--latency", type = float, default = 0.0, help = "added latency per request, ms")
+    parser.add_argument("--jitter", type = float, default = 0.0, help = "random +/- latency, ms")
+    parser.add_argument("--fail-rate", type = float, default = 0.0, help = "share of requests answered with 503")
+    parser.add_argument("--steps-per-second", type = float, default = 2000.0, help = "simulated stepper speed")
+    parser.add_argument("--max-position", type = int, default = 10000)
+    parser.add_argument("--no-batch-relays", action = "store_true", help = "answer 404 on /relays")
+    parser.add_argument("--no-events", action = "store_true", help = "answer 404 on /events")
+    parser.add_argument("--resonance", type = int, default = None, help = "position of the SWR minimum")
+    parser.add_argument("--bandwidth", type = float, default = 150.0, help = "steps from resonance to SWR 2.0")
+    args = parser.parse_args()
+    controller = MockController(
+        args.latency, args.jitter, args.fail_rate, args.steps_per_second, args.max_position,
+        not args.no_batch_relays, not args.no_events, args.resonance, args.bandwidth
+        )
+    server = serve(controller, args.host, args.port)
+    print(F"Mock controller on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+from time import monotonic, sleep
+
+from device_client import DeviceClient, DeviceError
+from tracing import tracer
+
+# Direction codes understood by /move: 0 increases step_count, 1 decreases it
+UP, DOWN = range(2)
+
+
+class MotionPlanner:
+    # With a PositionCache a fresh cached position replaces the /status read before a move,
+    # and every reply the planner gets is fed back into the cache
+    def __init__(self, max_move: int = 10000, poll_interval: float = 0.05, settle_timeout: float = 30.0, cache = None):
+        self.max_move: int = max_move
+        self.poll_interval: float = poll_interval
+        self.settle_timeout: float = settle_timeout
+        self.cache = cache
+
+    def configure(self, motion: dict):
+        self.max_move = int(motion.get("max_move", self.max_move))
+        self.poll_interval = float(motion.get("poll_interval", self.poll_interval))
+        self.settle_timeout = float(motion.get("settle_timeout", self.settle_timeout))
+
+    @staticmethod
+    def clamp(target: int, max_position: int = 0) -> int:
+        if max_position > 0:
+            target = min(target, max_position)
+        return max(target, 0)
+
+    def plan(self, current: int, target: int, max_position: int = 0) -> list[tuple[int, int]]:
+        target = self.clamp(target, max_position)
+        difference = target - current
+        direction = UP if difference > 0 else DOWN
+        remaining = abs(difference)
+        moves = []
+        # One move covers the whole distance unless the firmware limits a single move
+        while remaining > 0:
+            step = min(remaining, self.max_move)
+            moves.append((direction, step))
+            remaining -= step
+        return moves
+
+    def status(self, client: DeviceClient) -> dict:
+        status = client.status()
+        if self.cache is not None:
+            self.cache.confirm(status, status = True)
+        return status
+
+    def execute(self, client: DeviceClient, target: int, speed: int, on_move=None) -> dict:
+        with tracer.span("goto", target = target, speed = speed) as span:
+            status = self.run(client, target, speed, on_move, span)
+            span["step_count"] = status.get('step_count')
+            return status
+
+    def run(self, client: DeviceClient, target: int, speed: int, on_move, span: dict) -> dict:
+        known = self.cache.current() if self.cache is not None else None
+        span["cached"] = known is not None
+        if known is None:
+            status = self.status(client)
+            current = int(status.get('step_count', 0))
+            max_position = int(status.get('max_position', 0))
+        else:
+            current, max_position = known
+        span["from"] = current
+        moves = self.plan(current, target, max_position)
+        if not moves and known is not None:
+            # Already there, nothing to send
+            return self.cache.status()
+        span["moves"] = len(moves)
+        for direction, step in moves:
+            json = client.move(direction, step, speed)
+            if self.cache is not None:
+                self.cache.confirm(json)
+            if on_move is not None:
+                on_move(json)
+        status = self.settle(client, target)
+        if known is not None and int(status.get('step_count', target)) != self.clamp(target, max_position):
+            # Planned from a cached position the capacitor was not at, plan again from /status
+            self.cache.invalidate(mismatch = True)
+            return self.execute(client, target, speed, on_move)
+        return status
+
+    def settle(self, client: DeviceClient, target: int) -> dict:
+        # /move normally returns when the stepper is done; keep polling only while the position still changes
+        with tracer.span("settle") as span:
+            deadline = monotonic() + self.settle_timeout
+            status = self.status(client)
+            previous = None
+            polls = 1
+            while int(status.get('step_count', target)) != target and status.get('step_count') != previous:
+                if monotonic() > deadline:
+                    raise DeviceError(F"Move to {target} not finished in {self.settle_timeout} s")
+                previous = status.get('step_count')
+                sleep(self.poll_interval)
+                status = self.status(client)
+                polls += 1
+            span["polls"] = polls
+            return status
@@ -0,0 +1,94 @@
+import threading
+from time import monotonic
+
+from motion import UP
+
+
+class PositionCache():
+    # Where the capacitor is, as far as the worker knows. position is confirmed by the controller's own replies
+    # (/status, /move, /park), expected is where the commands queued so far will leave it, updated optimistically
+    # when a command is queued. A confirmation younger than max_age stands in for a /status read.
+    # Shared by the GUI thread (expect, invalidate) and the worker thread (confirm, current).
+    def __init__(self, max_age: float = 10.0):
+        self.max_age: float = max_age
+        self.lock = threading.Lock()
+        self.position: int | None = None
+        self.max_position: int = 0
+        self.expected: int | None = None
+        self.confirmed_at: float = 0.0
+        # Last /status reply, returned for a goto that needs no move
+        self.last: dict = {}
+        self.saved: int = 0
+        self.mismatches: int = 0
+
+    def clamp(self, target: int) -> int:
+        if self.max_position > 0:
+            target = min(target, self.max_position)
+        return max(target, 0)
+
+    def confirm(self, json: dict, status: bool = False):
+        # status=True for a full /status reply, other replies only carry the position
+        with self.lock:
+            if 'max_position' in json:
+                self.max_position = int(json['max_position'])
+            if 'step_count' in json:
+                self.position = int(json['step_count'])
+                self.confirmed_at = monotonic()
+            if status:
+                self.last = dict(json)
+
+    def fresh(self, max_age: float | None = None) -> bool:
+        with self.lock:
+            return self.position is not None and monotonic() - self.confirmed_at <= (
+                self.max_age if max_age is None else max_age)
+
+    def current(self) -> tuple[int, int] | None:
+        # (position, max_position) while fresh, None when /status has to be read
+        if not self.fresh():
+            return None
+        with self.lock:
+            self.saved += 1
+            return self.position, self.max_position
+
+    def status(self) -> dict:
+        with self.lock:
+            return dict(self.last, step_count = self.position, max_position = self.max_position)
+
+    def expect(self, name: str, args: tuple):
+        # Called as a command is queued, mirrors what CommandQueue keeps: a goto replaces whatever was expected
+        with self.lock:
+            match name:
+                case "goto":
+                    self.expected = self.clamp(int(args[0]))
+                case "move":
+                    base = self.expected if self.expected is not None else self.position
+                    if base is not None:
+                        step = int(args[1]) if int(args[0]) == UP else -int(args[1])
+                        self.expected = self.clamp(base + step)
+                case "park" | "autotune":
+                    # Ends up wherever the controller decides
+                    self.expected = None
+
+    def expected_position(self) -> int | None:
+        with self.lock:
+            return self.expected if self.expected is not None else self.position
+
+    def settle(self):
+        # Queue drained: the confirmed position is the truth, a wrong prediction is dropped
+        with self.lock:
+            self.expected = None
+
+    def check(self, position: int):
+        # A reading from outside the worker (status stream) while idle, a different position means the
+        # capacitor moved without us (manual knob, other software) and the cache has to be read again
+        with self.lock:
+            if self.position is not None and position != self.position:
+                self.mismatches += 1
+                self.position = None
+
+    def invalidate(self, mismatch: bool = False):
+        # mismatch=True when a plan made from the cache ended up somewhere else
+        with self.lock:
+            self.mismatches += mismatch
+            self.position = None
+            self.expected = None
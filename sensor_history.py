@@ -0,0 +1,99 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+CHANNELS = ("temperature", "humidity", "pressure")
+
+
+class SensorHistory():
+    # Fixed-size ring of (time, channel values) samples. When the ring is full the oldest block is
+    # appended to the rollover file before it is overwritten, so memory stays at capacity samples.
+    def __init__(self, capacity: int = 86400, channels: tuple[str, ...] = CHANNELS, rollover: str | None = None,
+                 rollover_bytes: int = 16 * 1024 * 1024, block: int = 3600):
+        self.channels = channels
+        self.block: int = max(1, min(block, capacity))
+        # A whole number of blocks, a block never wraps around the end of the ring
+        self.capacity: int = max(capacity // self.block, 1) * self.block
+        self.times = np.full(self.capacity, np.nan)
+        self.values = np.full((self.capacity, len(channels)), np.nan, dtype = np.float32)
+        self.head: int = 0
+        self.count: int = 0
+        self.version: int = 0
+        self.rollover = Path(rollover) if rollover else None
+        self.rollover_bytes: int = rollover_bytes
+        self.record = np.dtype([("t", "<f8"), ("v", "<f4", (len(channels),))])
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, t: float, sample: dict):
+        row = [float(sample[name]) if sample.get(name) is not None else np.nan for name in self.channels]
+        with self.lock:
+            if self.count == self.capacity and self.head % self.block == 0:
+                self.spill(self.head, self.head + self.block)
+            self.times[self.head] = t
+            self.values[self.head] = row
+            self.head = (self.head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self.version += 1
+
+    def spill(self, start: int, stop: int):
+        # Raw self.record rows, oldest first, readable with np.fromfile; the previous file is kept as ".1"
+        if self.rollover is None:
+            return
+        records = np.empty(stop - start, dtype = self.record)
+        records["t"] = self.times[start:stop]
+        records["v"] = self.values[start:stop]
+        try:
+            if self.rollover.exists() and self.rollover.stat().st_size + records.nbytes > self.rollover_bytes:
+                os.replace(self.rollover, self.rollover.with_name(self.rollover.name + ".1"))
+            with open(self.rollover, "ab") as f:
+                records.tofile(f)
+        except OSError:
+            # History on disk is best effort, the ring keeps working without it
+            pass
+
+    def window(self, start: float, stop: float) -> tuple[np.ndarray, np.ndarray]:
+        # Samples with start <= t < stop, copying only that range: a full ring is two sorted runs
+        with self.lock:
+            if self.count < self.capacity:
+                runs = [(0, self.count)]
+            else:
+                runs = [(self.head, self.capacity), (0, self.head)]
+            times, values = [], []
+            for begin, end in runs:
+                lo, hi = begin + np.searchsorted(self.times[begin:end], [start, stop])
+                times.append(self.times[lo:hi])
+                values.append(self.values[lo:hi])
+            return np.concatenate(times), np.concatenate(values)
+
+    def last(self) -> tuple[float, np.ndarray] | None:
+        with self.lock:
+            if not self.count:
+                return None
+            i = (self.head - 1) % self.capacity
+            return float(self.times[i]), self.values[i].copy()
+
+    def downsample(self, start: float, stop: float, buckets: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Min, max and mean per channel of equal time buckets over [start, stop), shape (buckets, channels).
+        # Buckets without samples are NaN.
+        times, values = self.window(start, stop)
+        shape = (buckets, len(self.channels))
+        low, high, mean = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+        if not len(times):
+            return low, high, mean
+        # Samples are in time order, so each bucket is one contiguous slice
+        edges = np.searchsorted(times, start + (stop - start) * np.arange(buckets + 1) / buckets)
+        counts = np.diff(edges)
+        filled = counts > 0
+        starts = edges[:-1][filled]
+        with np.errstate(invalid = "ignore"):
+            low[filled] = np.fmin.reduceat(values, starts, axis = 0)
+            high[filled] = np.fmax.reduceat(values, starts, axis = 0)
+            valid = ~np.isnan(values)
+            sums = np.add.reduceat(np.where(valid, values, 0), starts, axis = 0)
+            mean[filled] = sums / np.add.reduceat(valid, starts, axis = 0)
+        return low, high, mean
@@ -0,0 +1,126 @@
+import math
+from time import time
+
+import numpy as np
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from sensor_history import SensorHistory
+
+
+class SensorPlot(QtWidgets.QWidget):
+    # Strip chart of one sensor channel, one pixel column per seconds_per_pixel. The chart is kept in a
+    # pixmap: new samples scroll it and repaint only the newest columns, the whole chart is redrawn only
+    # when the value range grows or the widget is resized. Click to switch channels.
+    COLORS = ("#e0603a", "#3a8ee0", "#5cb85c")
+    UNITS = ("°", "%", " mmHg")
+
+    def __init__(self, history: SensorHistory, seconds_per_pixel: float = 10.0, parent = None):
+        super(SensorPlot, self).__init__(parent)
+        self.history = history
+        self.seconds_per_pixel: float = seconds_per_pixel
+        self.channel: int = 0
+        self.pixmap = QtGui.QPixmap()
+        self.last_column: int | None = None
+        self.range: tuple[float, float] | None = None
+        self.setMinimumHeight(60)
+        self.setToolTip(history.channels[self.channel])
+
+    def column(self, t: float) -> int:
+        return math.floor(t / self.seconds_per_pixel)
+
+    def y(self, value: float) -> float:
+        low, high = self.range
+        return (self.height() - 2) * (1 - (value - low) / (high - low)) + 1
+
+    def fit_range(self, low: float, high: float) -> bool:
+        # Grows the range with some headroom, True when the chart has to be redrawn
+        if math.isnan(low) or math.isnan(high):
+            return False
+        if self.range is not None and self.range[0] <= low and high <= self.range[1]:
+            return False
+        margin = max((high - low) * 0.25, 0.5)
+        if self.range is not None:
+            low, high = min(low, self.range[0]), max(high, self.range[1])
+        self.range = (low - margin, high + margin)
+        return True
+
+    def draw(self, first: int, last: int):
+        # Draws columns first..last (inclusive), the newest column is last and sits at the right edge
+        width = self.pixmap.width()
+        first = max(first, last - width + 1)
+        start, stop = first * self.seconds_per_pixel, (last + 1) * self.seconds_per_pixel
+        low, high, mean = self.history.downsample(start, stop, last - first + 1)
+        low, high, mean = low[:, self.channel], high[:, self.channel], mean[:, self.channel]
+        if self.fit_range(np.nanmin(low) if not np.isnan(low).all() else math.nan,
+                          np.nanmax(high) if not np.isnan(high).all() else math.nan) and first != last - width + 1:
+            self.redraw()
+            return
+        x0 = width - (last - first + 1)
+        painter = QtGui.QPainter(self.pixmap)
+        painter.fillRect(x0, 0, last - first + 1, self.pixmap.height(), self.palette().base())
+        if self.range is not None:
+            color = QtGui.QColor(self.COLORS[self.channel % len(self.COLORS)])
+            envelope = QtGui.QColor(color)
+            envelope.setAlpha(90)
+            for i in range(last - first + 1):
+                if math.isnan(mean[i]):
+                    continue
+                x = x0 + i
+                painter.setPen(envelope)
+                painter.drawLine(QtCore.QPointF(x, self.y(high[i])), QtCore.QPointF(x, self.y(low[i])))
+                painter.setPen(color)
+                painter.drawPoint(QtCore.QPointF(x, self.y(mean[i])))
+        painter.end()
+
+    def redraw(self):
+        self.pixmap = QtGui.QPixmap(max(self.width(), 1), max(self.height(), 1))
+        self.pixmap.fill(self.palette().base().color())
+        last = self.column(time())
+        self.last_column = last
+        self.draw(last - self.pixmap.width() + 1, last)
+        self.update()
+
+    def refresh(self):
+        # Called after each sample: scroll by the elapsed columns, repaint the new ones
+        if self.pixmap.isNull() or self.last_column is None:
+            self.redraw()
+            return
+        last = self.column(time())
+        shift = last - self.last_column
+        if shift >= self.pixmap.width():
+            self.redraw()
+            return
+        if shift > 0:
+            self.pixmap.scroll(-shift, 0, self.pixmap.rect())
+        self.draw(self.last_column, last)
+        self.last_column = last
+        if shift == 0:
+            # Same column as before: only it and the value caption changed
+            self.update(QtCore.QRect(self.width() - 1, 0, 1, self.height()))
+            self.update(self.caption_rect())
+        else:
+            self.update()
+
+    def caption_rect(self) -> QtCore.QRect:
+        return QtCore.QRect(0, 0, self.width(), self.fontMetrics().height() + 2)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(event.rect(), self.pixmap, event.rect())
+        if self.range is not None:
+            painter.setPen(self.palette().text().color())
+            sample = self.history.last()
+            value = sample[1][self.channel] if sample is not None else math.nan
+            if not math.isnan(value):
+                painter.drawText(self.caption_rect().adjusted(4, 0, 0, 0), QtCore.Qt.AlignmentFlag.AlignLeft,
+                                 F"{self.history.channels[self.channel]}: {value:.1f}{self.UNITS[self.channel]}")
+        painter.end()
+
+    def resizeEvent(self, event):
+        self.redraw()
+
+    def mousePressEvent(self, event):
+        self.channel = (self.channel + 1) % len(self.history.channels)
+        self.range = None
+        self.setToolTip(self.history.channels[self.channel])
+        self.redraw()
@@ -0,0 +1,39 @@
+from time import time
+
+from PyQt6 import QtCore
+
+from device_client import DeviceClient, DeviceError
+from sensor_history import SensorHistory
+
+
+class SensorSampler(QtCore.QThread):
+    # Reads /sensor at a fixed interval into a SensorHistory. Has its own DeviceClient, so samples keep
+    # their pace while the worker is busy with a long move.
+    sampled = QtCore.pyqtSignal(dict)
+    unavailable = QtCore.pyqtSignal(str)
+
+    def __init__(self, client: DeviceClient, history: SensorHistory, interval: float = 1.0):
+        super(SensorSampler, self).__init__()
+        self.client = client
+        self.history = history
+        self.interval: float = interval
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            started = time()
+            try:
+                sample = self.client.sensor()
+            except DeviceError as e:
+                if e.status_code == 404:
+                    # Controller without sensors, nothing to sample
+                    self.unavailable.emit(str(e))
+                    return
+            else:
+                self.history.append(started, sample)
+                self.sampled.emit(sample)
+            self.msleep(max(0, int((self.interval - (time() - started)) * 1000)))
+
+    def stop(self):
+        self.requestInterruption()
+        self.client.close()
+        self.wait()
@@ -0,0 +1,63 @@
+from PyQt6 import QtCore
+
+from device_client import DeviceClient, DeviceError
+
+
+class StatusStream(QtCore.QThread):
+    # Pushes step_count/status updates from the controller. Uses the /events SSE stream when the firmware has it
+    # and falls back to polling /status. Has its own DeviceClient, the worker's session is busy with commands.
+    updated = QtCore.pyqtSignal(dict)
+    mode_changed = QtCore.pyqtSignal(str)
+
+    def __init__(self, client: DeviceClient, mode: str = "auto", poll_interval: float = 1.0):
+        super(StatusStream, self).__init__()
+        self.client = client
+        self.mode: str = mode
+        self.poll_interval: float = poll_interval
+        self.sse_supported: bool = mode != "poll"
+
+    def configure(self, stream: dict):
+        self.mode = stream.get("mode", self.mode)
+        self.poll_interval = float(stream.get("poll_interval", self.poll_interval))
+        self.sse_supported = self.mode != "poll"
+
+    def run(self):
+        self.mode_changed.emit("sse" if self.sse_supported else "poll")
+        while not self.isInterruptionRequested():
+            if self.sse_supported:
+                self.listen()
+            else:
+                self.poll()
+
+    def listen(self):
+        try:
+            for event in self.client.events():
+                if event is not None:
+                    self.updated.emit(event)
+                if self.isInterruptionRequested():
+                    return
+        except DeviceError as e:
+            if e.status_code == 404 and self.mode == "auto":
+                self.sse_supported = False
+                self.mode_changed.emit("poll")
+                return
+        # stop() closes the stream under us
+        if self.isInterruptionRequested():
+            return
+        # Stream closed or timed out without events, reconnect after a short pause
+        self.msleep(int(self.poll_interval * 1000))
+
+    def poll(self):
+        if self.poll_interval <= 0:
+            self.msleep(500)
+            return
+        try:
+            self.updated.emit(self.client.status())
+        except DeviceError:
+            pass
+        self.msleep(int(self.poll_interval * 1000))
+
+    def stop(self):
+        self.requestInterruption()
+        self.client.close()
+        self.wait()
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The modules live at the top of the repository, not in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mock_controller import MockController, start_in_thread
+
+
+@pytest.fixture
+def controller():
+    # Fast stepper, so moves in tests take milliseconds
+    return MockController(steps_per_second = 1e6, max_position = 3000, resonance = 2900)
+
+
+@pytest.fixture
+def controller_url(controller):
+    server = start_in_thread(controller)
+    yield F"http://{server.server_address[0]}:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,47 @@
+import json as jconf
+from pathlib import Path
+
+import pytest
+
+from autotune import SwrTuner
+from device_client import DeviceClient, DeviceError
+from mock_controller import MockController, start_in_thread
+from motion import MotionPlanner
+
+
+def test_finds_the_swr_minimum(controller, controller_url):
+    result = SwrTuner(tolerance = 2).tune(DeviceClient(controller_url), MotionPlanner(), 10, 2500, 3000)
+    assert abs(result['step_count'] - controller.resonance) <= 10
+    assert controller.position == result['step_count']
+
+
+def test_center_beyond_the_range_is_clamped(controller, controller_url):
+    # A temperature-corrected target past max_position
+    result = SwrTuner().tune(DeviceClient(controller_url), MotionPlanner(), 10, 5000, 3000)
+    assert 0 <= result['step_count'] <= 3000
+
+
+def test_empty_range_is_a_device_error(controller_url):
+    with pytest.raises(DeviceError):
+        SwrTuner(window = -10).tune(DeviceClient(controller_url), MotionPlanner(), 10, 100, 3000)
+
+
+@pytest.mark.parametrize("resonance", [700, 3000, 7000, 9000, 9990])
+def test_full_range_fits_the_probe_budget(resonance):
+    # No band or frequency selected: the whole 10000 steps with the shipped settings
+    with open(Path(__file__).resolve().parent.parent / "api.json") as f:
+        settings = jconf.load(f)["api"]["autotune"]
+    tuner = SwrTuner()
+    tuner.configure(settings)
+    controller = MockController(steps_per_second = 1e7, max_position = 10000, resonance = resonance)
+    server = start_in_thread(controller)
+    try:
+        result = tuner.tune(
+            DeviceClient(F"http://{server.server_address[0]}:{server.server_address[1]}"), MotionPlanner(), 10,
+            None, 10000
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert abs(result['step_count'] - resonance) <= 10
+    assert result['probes'] <= tuner.max_probes
@@ -0,0 +1,76 @@
+import pytest
+
+from band_index import TuningTable, parse_frequency
+
+RELAYS = (True, False, False, False)
+OTHER = (False, True, False, False)
+
+
+def table() -> TuningTable:
+    tuning = TuningTable()
+    tuning.load([(3.65, 300, RELAYS), (7.1, 1200, RELAYS), (14.2, 2500, RELAYS)])
+    return tuning
+
+
+@pytest.mark.parametrize("freq", [7123, 50.0, 3.4, 15.0])
+def test_frequencies_outside_the_calibrated_range_are_refused(freq):
+    tuning = table()
+    assert not tuning.covers(freq)
+    with pytest.raises(KeyError, match = "outside the calibrated 3.65 - 14.2 MHz"):
+        tuning.steps_for(freq)
+
+
+def test_band_edges_just_outside_the_calibration_points_are_tuned():
+    tuning = table()
+    assert tuning.steps_for(3.5) == (300, RELAYS)
+    assert tuning.steps_for(14.35) == (2500, RELAYS)
+
+
+def test_empty_table_covers_nothing():
+    tuning = TuningTable()
+    assert not tuning.covers(7.1)
+    with pytest.raises(KeyError, match = "empty"):
+        tuning.steps_for(7.1)
+
+
+def test_parse_frequency():
+    assert parse_frequency("7.100 - 7.200 MHz") == pytest.approx(7.15)
+    assert parse_frequency("14.074") == 14.074
+    assert parse_frequency("40m") == 40.0
+    assert parse_frequency("") is None
+
+
+def test_steps_are_interpolated_between_neighbours():
+    tuning = table()
+    assert tuning.steps_for(7.1) == (1200, RELAYS)
+    assert tuning.steps_for(10.65) == (1850, RELAYS)
+
+
+def test_only_points_of_the_same_relay_combination_are_interpolated():
+    tuning = table()
+    tuning.add(10.1, 9000, OTHER)
+    # The closest point decides the relays, interpolation stays within its combination
+    assert tuning.relays_for(10.0) == OTHER
+    assert tuning.steps_for(10.0) == (9000, OTHER)
+    assert tuning.relays_for(8.0) == RELAYS
+    assert tuning.steps_for(10.0, RELAYS) == (round(1200 + 1300 * 2.9 / 7.1), RELAYS)
+    with pytest.raises(KeyError, match = "No calibration points"):
+        tuning.steps_for(10.0, (True, True, True, True))
+
+
+def test_add_and_remove_keep_the_index_sorted():
+    tuning = table()
+    tuning.add(10.1, 9000, OTHER)
+    tuning.add(7.1, 1250, RELAYS)
+    assert tuning.steps_for(7.1) == (1250, RELAYS)
+    assert [freq for freq, _ in tuning.index] == [3.65, 7.1, 10.1, 14.2]
+    tuning.remove(10.1, OTHER)
+    assert OTHER not in tuning.sets
+    assert len(tuning) == 3
+
+
+def test_load_keeps_the_last_step_of_a_duplicate_point():
+    tuning = TuningTable()
+    tuning.load([(7.1, 1200, RELAYS), (7.1, 1300, RELAYS), (14.2, 2500, RELAYS)])
+    assert len(tuning) == 2
+    assert tuning.steps_for(7.1) == (1300, RELAYS)
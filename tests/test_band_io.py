@@ -0,0 +1,63 @@
+import pytest
+
+from band_io import BandFormatError, read_bands, validate, write_bands
+
+BANDS = [
+    {"band": "80m", "step": "300", "relay1": True, "relay2": False, "relay3": False, "relay4": True,
+     "desc": "3.5-3.8 МГц"},
+    {"band": "40m", "step": "1200", "relay1": False, "relay2": True, "relay3": False, "relay4": False, "desc": ""},
+    ]
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".jsonl", ".mlb"])
+def test_round_trip(tmp_path, suffix):
+    path = tmp_path / F"bands{suffix}"
+    assert write_bands(path, BANDS) == len(BANDS)
+    assert list(read_bands(path)) == BANDS
+
+
+def test_validate_normalizes_a_row():
+    row = validate({"band": " 20m ", "step": 2500, "relay1": "yes", "relay3": "1", "desc": None})
+    assert row == {"band": "20m", "step": "2500", "relay1": True, "relay2": False, "relay3": True,
+                   "relay4": False, "desc": ""}
+
+
+@pytest.mark.parametrize("step, message", [
+    ("abc", "not an integer"), ("", "missing step"), ("-5", "negative"),
+    ])
+def test_validate_rejects_bad_steps(step, message):
+    with pytest.raises(BandFormatError, match = message):
+        validate({"band": "40m", "step": step})
+
+
+def test_validate_rejects_bad_relay_states():
+    with pytest.raises(BandFormatError, match = "relay state"):
+        validate({"band": "40m", "step": "1", "relay2": "maybe"})
+
+
+def test_csv_error_names_the_line(tmp_path):
+    path = tmp_path / "bands.csv"
+    path.write_text("band,step\n80m,300\n40m,abc\n")
+    with pytest.raises(BandFormatError) as error:
+        list(read_bands(path))
+    assert error.value.line == 3
+
+
+def test_unknown_csv_columns_are_refused(tmp_path):
+    path = tmp_path / "bands.csv"
+    path.write_text("band,step,color\n80m,300,red\n")
+    with pytest.raises(BandFormatError, match = "unknown columns"):
+        list(read_bands(path))
+
+
+def test_truncated_binary_snapshot(tmp_path):
+    path = tmp_path / "bands.mlb"
+    write_bands(path, BANDS)
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(BandFormatError, match = "truncated"):
+        list(read_bands(path))
+
+
+def test_unknown_format():
+    with pytest.raises(BandFormatError):
+        list(read_bands("bands.txt"))
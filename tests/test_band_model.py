@@ -0,0 +1,18 @@
+from band_model import BandTableModel
+
+BAND = {"band": "40m", "step": "1200", "relay1": True, "relay2": False, "relay3": False, "relay4": False, "desc": ""}
+
+
+def test_set_steps_finds_the_band_by_id():
+    model = BandTableModel()
+    model.load({"3": BAND, "5": dict(BAND, band = "20m")})
+    edited = []
+    model.band_edited.connect(lambda band_id, band: edited.append((band_id, band["step"])))
+    model.sort(BandTableModel.BAND)
+    model.set_filter("40")
+    # Sorted and filtered since the band was picked
+    assert model.set_steps("5", 2500)
+    assert edited == [("5", "2500")]
+    model.set_filter("")
+    assert model.band(model.find("20m"))["step"] == "2500"
+    assert not model.set_steps("9", 100)
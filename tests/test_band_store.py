@@ -0,0 +1,115 @@
+import json as jconf
+
+from band_store import BandStore
+
+BAND = {"band": "40m", "step": "1200", "relay1": True, "relay2": False, "relay3": False, "relay4": False, "desc": ""}
+
+
+def reopen(path) -> tuple[BandStore, dict]:
+    store = BandStore(str(path))
+    bands = store.load()
+    store.close()
+    return store, bands
+
+
+def test_edits_survive_a_restart(tmp_path):
+    path = tmp_path / "bands.json"
+    store, _ = reopen(path)
+    first = store.add(BAND)
+    second = store.add(dict(BAND, band = "20m"))
+    store.edit(first, dict(BAND, step = "1300"))
+    store.delete(second)
+    store.close()
+    _, bands = reopen(path)
+    assert bands == {first: dict(BAND, step = "1300")}
+
+
+def test_ids_continue_after_the_snapshot(tmp_path):
+    path = tmp_path / "bands.json"
+    path.write_text(jconf.dumps({"bands": {"0": BAND, "7": BAND}}))
+    store, _ = reopen(path)
+    assert store.add(BAND) == "8"
+    assert store.add_many([BAND, BAND]) == ["9", "10"]
+    store.close()
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    path = tmp_path / "bands.json"
+    store = BandStore(str(path), compact_after = 3)
+    store.load()
+    ids = store.add_many([BAND, BAND, BAND])
+    store.close()
+    assert set(jconf.loads(path.read_text())["bands"]) == set(ids)
+    assert store.journal.read_text() == ""
+    assert store.journal_ops == 0
+    _, bands = reopen(path)
+    assert set(bands) == set(ids)
+
+
+def test_replaying_ops_already_in_the_snapshot_is_harmless(tmp_path):
+    path = tmp_path / "bands.json"
+    path.write_text(jconf.dumps({"bands": {"0": BAND}}))
+    (tmp_path / "bands.journal").write_text(jconf.dumps({"op": "add", "id": "0", "band": BAND}) + "\n")
+    _, bands = reopen(path)
+    assert bands == {"0": BAND}
+
+
+def test_torn_last_line_does_not_swallow_later_edits(tmp_path):
+    path = tmp_path / "bands.json"
+    journal = tmp_path / "bands.journal"
+    journal.write_text('{"op": "add", "id": "0", "band": {"st')
+    store, bands = reopen(path)
+    assert bands == {}
+    band_id = store.add(BAND)
+    store.close()
+    _, bands = reopen(path)
+    assert bands == {band_id: BAND}
+
+
+def test_torn_line_without_a_newline_is_cut_off(tmp_path):
+    path = tmp_path / "bands.json"
+    journal = tmp_path / "bands.journal"
+    complete = jconf.dumps({"op": "add", "id": "0", "band": BAND}) + "\n"
+    # Parses, but the write never reached its newline
+    journal.write_text(complete + jconf.dumps({"op": "add", "id": "1", "band": BAND}))
+    store = BandStore(str(path))
+    assert store.load() == {"0": BAND}
+    assert journal.read_text() in (complete, "")
+    store.close()
+
+
+def test_ops_after_a_bad_line_are_replayed(tmp_path):
+    path = tmp_path / "bands.json"
+    (tmp_path / "bands.journal").write_text(
+        '{"op": "add", "id": "0"' + jconf.dumps({"op": "add", "id": "1", "band": BAND}) + "\n"
+        + jconf.dumps({"op": "add", "id": "2", "band": BAND}) + "\n"
+        )
+    _, bands = reopen(path)
+    assert bands == {"2": BAND}
+
+
+def test_read_leaves_both_files_alone(tmp_path):
+    path = tmp_path / "bands.json"
+    journal = tmp_path / "bands.journal"
+    path.write_text(jconf.dumps({"bands": {"0": BAND}}))
+    journal.write_text(jconf.dumps({"op": "add", "id": "1", "band": BAND}) + "\n" + '{"op": "add", "id": "2"')
+    snapshot, ops = path.read_text(), journal.read_text()
+    assert BandStore(str(path)).read() == {"0": BAND, "1": BAND}
+    assert path.read_text() == snapshot
+    assert journal.read_text() == ops
+
+
+def test_ids_of_deleted_bands_are_not_reused(tmp_path):
+    path = tmp_path / "bands.json"
+    store = BandStore(str(path), compact_after = 2)
+    store.load()
+    first, second = store.add(BAND), store.add(BAND)
+    store.close()
+    store.delete(second)
+    assert store.add(BAND) == "2"
+    # Also after the journal was compacted away and the highest band deleted again
+    store.delete("2")
+    store.close()
+    store, _ = reopen(path)
+    assert store.add(BAND) == "3"
+    store.close()
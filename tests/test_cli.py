@@ -0,0 +1,18 @@
+import json as jconf
+
+import cli
+
+BAND = {"band": "40m", "step": "1200", "relay1": True, "relay2": False, "relay3": False, "relay4": False, "desc": ""}
+
+
+def test_list_bands_does_not_write_the_band_files(tmp_path, capsys):
+    # Station software runs this while the GUI journals edits to the same files
+    path = tmp_path / "bands.json"
+    journal = tmp_path / "bands.journal"
+    path.write_text(jconf.dumps({"bands": {"0": BAND}}))
+    journal.write_text(jconf.dumps({"op": "edit", "id": "0", "band": dict(BAND, step = "1300")}) + "\n")
+    snapshot, ops = path.read_text(), journal.read_text()
+    assert cli.main(["--list-bands", "--json", "--bands", str(path), "--config", str(tmp_path / "api.json")]) == 0
+    assert jconf.loads(capsys.readouterr().out)["bands"] == {"0": dict(BAND, step = "1300")}
+    assert path.read_text() == snapshot
+    assert journal.read_text() == ops
@@ -0,0 +1,84 @@
+from command_queue import CommandQueue
+from motion import UP, DOWN
+
+
+def drain(queue: CommandQueue) -> list:
+    commands = []
+    while (command := queue.get()) is not None:
+        commands.append(command)
+    return commands
+
+
+def test_consecutive_jogs_merge_into_one_net_move():
+    queue = CommandQueue()
+    queue.put("move", (UP, 100, 10))
+    queue.put("move", (UP, 50, 10))
+    queue.put("move", (DOWN, 30, 10))
+    assert drain(queue) == [("move", (UP, 120, 10))]
+    assert queue.merged == 2
+
+
+def test_opposite_jogs_cancel_out():
+    queue = CommandQueue()
+    queue.put("move", (UP, 100, 10))
+    queue.put("move", (DOWN, 100, 10))
+    assert drain(queue) == []
+
+
+def test_jogs_at_another_speed_are_not_merged():
+    queue = CommandQueue()
+    queue.put("move", (UP, 100, 10))
+    queue.put("move", (UP, 100, 20))
+    assert len(drain(queue)) == 2
+
+
+def test_full_queue_refuses_jogs_only():
+    queue = CommandQueue(max_depth = 2)
+    queue.put("relay", ("1", True))
+    queue.put("status", ())
+    assert queue.full()
+    assert not queue.put("move", (UP, 100, 10))
+    assert queue.put("goto", (500, 10))
+
+
+def test_goto_cancels_queued_moves_and_gotos():
+    queue = CommandQueue()
+    queue.put("move", (UP, 100, 10))
+    queue.put("relay", ("1", True))
+    queue.put("goto", (500, 10))
+    queue.put("goto", (700, 10))
+    assert drain(queue) == [("relay", ("1", True)), ("goto", (700, 10))]
+    assert queue.cancelled == 2
+
+
+def test_park_cancels_queued_gotos():
+    queue = CommandQueue()
+    queue.put("goto", (500, 10))
+    queue.put("park", ())
+    assert drain(queue) == [("park", ())]
+
+
+def test_cancelled_commands_are_reported():
+    cancelled = []
+    queue = CommandQueue(on_cancel = lambda name, args: cancelled.append((name, args)))
+    queue.put("move", (UP, 100, 10))
+    queue.put("goto", (500, 10))
+    queue.put("park", ())
+    assert cancelled == [("move", (UP, 100, 10)), ("goto", (500, 10))]
+
+
+def test_on_cancel_can_queue_the_next_command():
+    queue = CommandQueue()
+    # Like the control server starting its pending retune, must not deadlock on the queue lock
+    queue.on_cancel = lambda name, args: queue.put("status", ())
+    queue.put("goto", (500, 10))
+    queue.put("park", ())
+    assert drain(queue) == [("park", ()), ("status", ())]
+
+
+def test_repeated_reads_are_queued_once():
+    queue = CommandQueue()
+    queue.put("status", ())
+    queue.put("sensor", ())
+    queue.put("status", ())
+    assert drain(queue) == [("status", ()), ("sensor", ())]
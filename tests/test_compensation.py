@@ -0,0 +1,62 @@
+from compensation import TemperatureCompensation
+
+
+def test_slope_is_fitted_across_bands(tmp_path):
+    model = TemperatureCompensation(str(tmp_path / "compensation.jsonl"))
+    model.load()
+    for temperature, step in ((10, 100), (20, 120)):
+        model.observe("0", temperature, step)
+    for temperature, step in ((15, 500), (25, 520)):
+        model.observe("1", temperature, step)
+    assert model.slope == 2.0
+    assert model.correction("0", 25) == 10
+    # The full refit over the log agrees with the running totals
+    reloaded = TemperatureCompensation(str(tmp_path / "compensation.jsonl"))
+    reloaded.load()
+    assert reloaded.slope == 2.0
+
+
+def test_no_slope_without_enough_spread(tmp_path):
+    model = TemperatureCompensation(str(tmp_path / "compensation.jsonl"), min_spread = 5.0)
+    model.load()
+    model.observe("0", 20, 100)
+    model.observe("0", 21, 110)
+    assert model.slope == 0.0
+    assert model.correction("0", 30) == 0
+
+
+def test_torn_line_does_not_hide_later_observations(tmp_path):
+    path = tmp_path / "compensation.jsonl"
+    model = TemperatureCompensation(str(path))
+    model.load()
+    model.observe("0", 10, 100)
+    with open(path, "a") as f:
+        f.write('{"id": "0", "temp')
+    model = TemperatureCompensation(str(path))
+    model.load()
+    model.observe("0", 20, 120)
+    model = TemperatureCompensation(str(path))
+    model.load()
+    assert model.slope == 2.0
+
+
+def test_forgotten_band_keeps_informing_the_slope_only(tmp_path):
+    path = tmp_path / "compensation.jsonl"
+    model = TemperatureCompensation(str(path))
+    model.load()
+    for temperature, step in ((10, 100), (20, 120)):
+        model.observe("0", temperature, step)
+    model.forget("0")
+    assert model.correction("0", 30) == 0
+    assert model.slope == 2.0
+    # After a restart the deleted band's history stays retired, a new observation under the id starts afresh
+    model = TemperatureCompensation(str(path))
+    model.load()
+    assert model.correction("0", 30) == 0
+    assert model.slope == 2.0
+    model.observe("0", 25, 500)
+    assert model.correction("0", 30) == 10
+    reloaded = TemperatureCompensation(str(path))
+    reloaded.load()
+    assert reloaded.correction("0", 30) == 10
+    assert reloaded.stats.keys() == model.stats.keys()
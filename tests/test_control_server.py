@@ -0,0 +1,53 @@
+import pytest
+from PyQt6 import QtCore
+
+from control_server import ControlServer
+
+
+# QTcpServer needs an application object, no event loop runs
+app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def gotos() -> list:
+    return []
+
+
+@pytest.fixture
+def server(gotos):
+    # Targets are the step itself, every retune is queued
+    return ControlServer(lambda kind, value: (int(value), ()), lambda step, relays: gotos.append(step) or True)
+
+
+def test_pending_retune_runs_after_its_own_arrival(server, gotos):
+    server.request("freq", "1000", 0.0)
+    server.request("freq", "2000", 0.0)
+    server.request("freq", "3000", 0.0)
+    assert gotos == [1000]
+    server.on_finished({'step_count': 1000, 'target': 1000})
+    assert gotos == [1000, 3000]
+    assert server.coalesced == 1
+
+
+def test_arrival_of_another_goto_does_not_end_the_retune(server, gotos):
+    retuned = []
+    server.retuned.connect(retuned.append)
+    server.request("freq", "1000", 0.0)
+    # A GUI Tune that was already moving
+    server.on_finished({'step_count': 500, 'target': 500})
+    assert server.busy
+    server.request("freq", "2000", 0.0)
+    assert gotos == [1000]
+    server.on_finished({'step_count': 1000, 'target': 1000})
+    assert len(retuned) == 1
+    assert gotos == [1000, 2000]
+
+
+def test_failed_or_cancelled_goto_frees_the_server(server):
+    server.request("freq", "1000", 0.0)
+    server.on_failed("goto", "timeout")
+    assert not server.busy
+    server.request("freq", "2000", 0.0)
+    server.request("freq", "3000", 0.0)
+    server.on_cancelled("goto")
+    assert not server.busy and server.pending is None
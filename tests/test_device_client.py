@@ -0,0 +1,28 @@
+import threading
+from time import perf_counter, sleep
+
+from device_client import DeviceClient, DeviceError
+
+
+def test_close_events_wakes_a_blocked_read(controller_url):
+    client = DeviceClient(controller_url)
+    received = []
+
+    def read():
+        try:
+            for event in client.events():
+                received.append(event)
+        except DeviceError:
+            pass
+
+    reader = threading.Thread(target = read)
+    reader.start()
+    # The first event is the current state, after it the idle stream blocks until the 5 s keep-alive
+    while not received:
+        sleep(0.01)
+    started = perf_counter()
+    client.close_events()
+    reader.join(2.0)
+    assert not reader.is_alive()
+    assert perf_counter() - started < 1.0
+    assert client.events_response is None
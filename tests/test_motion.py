@@ -0,0 +1,56 @@
+import pytest
+
+from device_client import DeviceClient
+from motion import DOWN, UP, MotionPlanner
+from position_cache import PositionCache
+
+
+@pytest.mark.parametrize("current, target, max_position, moves", [
+    (100, 250, 0, [(UP, 150)]),
+    (250, 100, 0, [(DOWN, 150)]),
+    (100, 100, 0, []),
+    # Split by max_move
+    (0, 2500, 0, [(UP, 1000), (UP, 1000), (UP, 500)]),
+    # Clamped to 0 .. max_position
+    (100, 5000, 3000, [(UP, 1000), (UP, 1000), (UP, 900)]),
+    (100, -50, 3000, [(DOWN, 100)]),
+    ])
+def test_plan(current, target, max_position, moves):
+    assert MotionPlanner(max_move = 1000).plan(current, target, max_position) == moves
+
+
+def test_execute_reads_the_position_without_a_cache(controller, controller_url):
+    controller.position = 500
+    status = MotionPlanner().execute(DeviceClient(controller_url), 1200, 10)
+    assert status['step_count'] == 1200 == controller.position
+    assert controller.calls['/status'] >= 1
+
+
+def test_fresh_cache_replaces_the_status_read(controller, controller_url):
+    controller.position = 500
+    cache = PositionCache()
+    cache.confirm({'step_count': 500, 'max_position': 3000}, status = True)
+    status = MotionPlanner(cache = cache).execute(DeviceClient(controller_url), 1200, 10)
+    assert status['step_count'] == 1200 == controller.position
+    assert cache.saved == 1
+    assert cache.mismatches == 0
+
+
+def test_stale_cache_is_replanned_from_status(controller, controller_url):
+    # The knob was turned: the cache says 1000, the capacitor is at 500
+    controller.position = 500
+    cache = PositionCache()
+    cache.confirm({'step_count': 1000, 'max_position': 3000}, status = True)
+    status = MotionPlanner(cache = cache).execute(DeviceClient(controller_url), 1200, 10)
+    assert status['step_count'] == 1200 == controller.position
+    assert cache.mismatches == 1
+    assert cache.position == 1200
+
+
+def test_nothing_is_sent_when_the_cache_is_at_the_target(controller, controller_url):
+    controller.position = 700
+    cache = PositionCache()
+    cache.confirm({'step_count': 700, 'max_position': 3000, 'status': "idle"}, status = True)
+    status = MotionPlanner(cache = cache).execute(DeviceClient(controller_url), 700, 10)
+    assert status['step_count'] == 700
+    assert not controller.calls['/move'] and not controller.calls['/status']
@@ -0,0 +1,62 @@
+from motion import DOWN, UP
+from position_cache import PositionCache
+
+
+def confirmed(position: int = 1000, max_position: int = 3000) -> PositionCache:
+    cache = PositionCache()
+    cache.confirm({'step_count': position, 'max_position': max_position, 'status': "idle"}, status = True)
+    return cache
+
+
+def test_confirmed_position_is_current_while_fresh():
+    cache = confirmed()
+    assert cache.current() == (1000, 3000)
+    assert cache.saved == 1
+    assert cache.status() == {'step_count': 1000, 'max_position': 3000, 'status': "idle"}
+    cache.max_age = -1.0
+    assert cache.current() is None
+
+
+def test_expect_follows_the_queued_commands():
+    cache = confirmed()
+    assert cache.expected_position() == 1000
+    cache.expect("move", (UP, 200))
+    cache.expect("move", (DOWN, 50))
+    assert cache.expected_position() == 1150
+    # A goto replaces whatever was expected, clamped to the range
+    cache.expect("goto", (5000,))
+    assert cache.expected_position() == 3000
+    cache.expect("move", (DOWN, 4000))
+    assert cache.expected_position() == 0
+    # Unknown until the controller reports back
+    cache.expect("park", ())
+    assert cache.expected_position() == 1000
+
+
+def test_settle_drops_the_prediction():
+    cache = confirmed()
+    cache.expect("goto", (2000,))
+    cache.confirm({'step_count': 1990})
+    cache.settle()
+    assert cache.expected_position() == 1990
+
+
+def test_check_drops_a_position_moved_from_outside():
+    cache = confirmed()
+    cache.check(1000)
+    assert cache.current() == (1000, 3000)
+    cache.check(1200)
+    assert cache.mismatches == 1
+    assert cache.current() is None
+    # Nothing left to compare with
+    cache.check(1300)
+    assert cache.mismatches == 1
+
+
+def test_invalidate():
+    cache = confirmed()
+    cache.expect("goto", (2000,))
+    cache.invalidate(mismatch = True)
+    assert cache.expected_position() is None
+    assert cache.current() is None
+    assert cache.mismatches == 1
@@ -0,0 +1,64 @@
+import numpy as np
+
+from sensor_history import SensorHistory
+
+
+def filled(history: SensorHistory, times) -> SensorHistory:
+    for t in times:
+        history.append(float(t), {"temperature": t, "humidity": 40 + t, "pressure": None})
+    return history
+
+
+def test_capacity_is_a_whole_number_of_blocks():
+    assert SensorHistory(capacity = 10, block = 4).capacity == 8
+    assert SensorHistory(capacity = 3, block = 10).capacity == 3
+
+
+def test_full_ring_keeps_the_newest_samples_in_order():
+    history = filled(SensorHistory(capacity = 4, block = 2), range(6))
+    assert len(history) == 4
+    times, values = history.window(0, 100)
+    assert times.tolist() == [2, 3, 4, 5]
+    assert values[:, 0].tolist() == [2, 3, 4, 5]
+    assert np.isnan(values[:, 2]).all()
+    # A window across the wrap-around point
+    assert history.window(3, 5)[0].tolist() == [3, 4]
+    t, last = history.last()
+    assert t == 5 and last[0] == 5
+
+
+def test_oldest_block_is_spilled_before_it_is_overwritten(tmp_path):
+    path = tmp_path / "sensors.bin"
+    history = filled(SensorHistory(capacity = 4, block = 2, rollover = str(path)), range(6))
+    records = np.fromfile(path, dtype = history.record)
+    assert records["t"].tolist() == [0, 1]
+    assert records["v"][:, 1].tolist() == [40, 41]
+
+
+def test_full_rollover_file_is_rotated(tmp_path):
+    path = tmp_path / "sensors.bin"
+    history = SensorHistory(capacity = 4, block = 2, rollover = str(path))
+    # Room for exactly one spilled block
+    history.rollover_bytes = 2 * history.record.itemsize
+    filled(history, range(8))
+    previous = np.fromfile(tmp_path / "sensors.bin.1", dtype = history.record)
+    assert previous["t"].tolist() == [0, 1]
+    assert np.fromfile(path, dtype = history.record)["t"].tolist() == [2, 3]
+
+
+def test_downsample_buckets():
+    history = filled(SensorHistory(capacity = 16, block = 4), range(10))
+    low, high, mean = history.downsample(0, 20, 4)
+    assert low[:, 0].tolist()[:2] == [0, 5]
+    assert high[:, 0].tolist()[:2] == [4, 9]
+    assert mean[:, 0].tolist()[:2] == [2, 7]
+    # Buckets without samples, and a channel without readings
+    assert np.isnan(mean[2:]).all()
+    assert np.isnan(mean[:, 2]).all()
+
+
+def test_downsample_of_an_empty_range():
+    history = filled(SensorHistory(capacity = 4, block = 2), range(3))
+    low, high, mean = history.downsample(100, 200, 3)
+    assert low.shape == (3, 3)
+    assert np.isnan(low).all() and np.isnan(high).all() and np.isnan(mean).all()
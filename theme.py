@@ -0,0 +1,62 @@
+import re
+from pathlib import Path
+
+from PyQt6 import QtCore, QtWidgets
+
+STYLESHEETS_DIR = Path(__file__).resolve().parent / "stylesheets"
+COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+URL = re.compile(r"url\(\s*[\"']?(?![:/])([^)\"']+?)[\"']?\s*\)")
+
+
+class ThemeLoader(QtCore.QObject):
+    # Reads every .qss once and applies it to the whole application, dialogs inherit it without touching disk
+    def __init__(self, app: QtWidgets.QApplication, directory: Path = STYLESHEETS_DIR):
+        super(ThemeLoader, self).__init__()
+        self.app = app
+        self.directory = directory
+        self.cache: dict[str, str] = {}
+        self.current: str = ""
+        self.watcher: QtCore.QFileSystemWatcher | None = None
+
+    def themes(self) -> list[str]:
+        return sorted(path.stem for path in self.directory.glob("*.qss"))
+
+    def precompile(self):
+        for name in self.themes():
+            self.load(name)
+
+    def load(self, name: str) -> str:
+        if name not in self.cache:
+            path = self.directory / F"{name}.qss"
+            with open(path, "r", encoding = "utf-8") as fh:
+                self.cache[name] = self.preprocess(fh.read())
+        return self.cache[name]
+
+    def preprocess(self, qss: str) -> str:
+        # Drop comments and indentation, make relative image paths independent of the working directory
+        qss = COMMENT.sub("", qss)
+        qss = URL.sub(lambda m: F"url({(self.directory / m.group(1)).as_posix()})", qss)
+        return "\n".join(line.strip() for line in qss.splitlines() if line.strip())
+
+    def apply(self, name: str):
+        self.app.setStyleSheet(self.load(name))
+        self.current = name
+        if self.watcher is not None:
+            self.watcher.removePaths(self.watcher.files())
+            self.watcher.addPath(str(self.directory / F"{name}.qss"))
+
+    def watch(self):
+        # Development helper: re-apply the current theme whenever its file is saved
+        self.watcher = QtCore.QFileSystemWatcher()
+        self.watcher.fileChanged.connect(self.reload)
+        if self.current:
+            self.watcher.addPath(str(self.directory / F"{self.current}.qss"))
+
+    def reload(self, path: str):
+        name = Path(path).stem
+        self.cache.pop(name, None)
+        if name == self.current:
+            self.apply(name)
+        # Editors that replace the file on save drop it from the watcher
+        if path not in self.watcher.files() and Path(path).exists():
+            self.watcher.addPath(path)
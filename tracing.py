@@ -0,0 +1,177 @@
+import argparse
+import atexit
+import json as jconf
+import math
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class Tracer():
+    # Timeline of device calls and motion phases, one Chrome trace "complete" event per JSON line
+    # (load with --chrome into chrome://tracing or Perfetto). Off unless enabled, then every span costs
+    # a JSON dump and a buffered write under a lock.
+    def __init__(self):
+        self.enabled: bool = False
+        self.lock = threading.Lock()
+        self.file = None
+        self.origin: float = perf_counter()
+        self.threads: set[int] = set()
+
+    def enable(self, path: str):
+        self.file = open(path, "w", buffering = 1 << 16)
+        self.origin = perf_counter()
+        self.enabled = True
+        atexit.register(self.close)
+
+    def close(self):
+        with self.lock:
+            self.enabled = False
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def record(self, name: str, cat: str, start: float, end: float, **args):
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        event = {
+            "name": name, "cat": cat, "ph": "X", "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1), "pid": os.getpid(), "tid": thread.ident, "args": args
+            }
+        with self.lock:
+            if self.file is None:
+                return
+            if thread.ident not in self.threads:
+                self.threads.add(thread.ident)
+                self.file.write(jconf.dumps({
+                    "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident,
+                    "args": {"name": thread.name}
+                    }) + "\n")
+            self.file.write(jconf.dumps(event, default = str) + "\n")
+
+    def http(self, method: str, endpoint: str, start: float, end: float, sent: dict | None, received: dict | None,
+             error: str | None = None):
+        # Payload sizes are of the JSON bodies, without HTTP headers
+        args = {
+            "method": method, "sent": len(jconf.dumps(sent)) if sent is not None else 0,
+            "received": len(jconf.dumps(received)) if received is not None else 0
+            }
+        if error is not None:
+            args["error"] = error
+        self.record(endpoint, "http", start, end, **args)
+
+    @contextmanager
+    def span(self, name: str, cat: str = "motion", **args):
+        # The yielded dict can be filled with results, they are recorded as the span's args
+        if not self.enabled:
+            yield args
+            return
+        start = perf_counter()
+        try:
+            yield args
+        except Exception as e:
+            args["error"] = str(e)
+            raise
+        finally:
+            self.record(name, cat, start, perf_counter(), **args)
+
+
+tracer = Tracer()
+
+
+def read_trace(path: str) -> list[dict]:
+    events = []
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                event = jconf.loads(line)
+            except ValueError:
+                # A torn last line from a crash mid-write
+                break
+            events.append(event)
+    return events
+
+
+def percentile(values: list[float], p: float) -> float:
+    # Nearest rank of sorted values
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def endpoint_table(events: list[dict]) -> list[str]:
+    durations: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for event in events:
+        if event.get("cat") == "http":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+            errors[event["name"]] = errors.get(event["name"], 0) + ("error" in event["args"])
+    lines = [F"{'endpoint':<12} {'calls':>6} {'errors':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  ms"]
+    for name, values in sorted(durations.items(), key = lambda item: -sum(item[1])):
+        values.sort()
+        lines.append(
+            F"{name:<12} {len(values):>6} {errors[name]:>6} {percentile(values, 50):>8.1f} "
+            F"{percentile(values, 95):>8.1f} {percentile(values, 99):>8.1f} {values[-1]:>8.1f}"
+            )
+    return lines
+
+
+def retune_breakdown(events: list[dict]) -> list[str]:
+    # Every goto split into what ran inside it on the same thread: the /status read before moving,
+    # the /move calls (the firmware answers once the stepper is done, so they include the travel),
+    # settling and whatever is left (planning, signal emission)
+    by_thread: dict[tuple[int, int], list[dict]] = {}
+    for event in sorted((e for e in events if e.get("ph") == "X"), key = lambda e: e["ts"]):
+        by_thread.setdefault((event["pid"], event["tid"]), []).append(event)
+    totals = {"total": [], "status": [], "move": [], "settle": [], "other": []}
+    for thread_events in by_thread.values():
+        starts = [event["ts"] for event in thread_events]
+        outer_end = -1.0
+        for event in thread_events:
+            # A goto planned again after a cache mismatch runs inside the first one
+            if event["name"] != "goto" or event["ts"] < outer_end:
+                continue
+            end = outer_end = event["ts"] + event["dur"]
+            parts = dict.fromkeys(("status", "move", "settle"), 0.0)
+            settle_end = -1.0
+            for child in thread_events[bisect_left(starts, event["ts"]):bisect_left(starts, end)]:
+                if child["ts"] < settle_end:
+                    continue
+                if child["name"] == "settle":
+                    parts["settle"] += child["dur"]
+                    settle_end = child["ts"] + child["dur"]
+                elif child["cat"] == "http" and child["name"] in ("/move", "/status"):
+                    parts["move" if child["name"] == "/move" else "status"] += child["dur"]
+            totals["total"].append(event["dur"] / 1000)
+            for key, value in parts.items():
+                totals[key].append(value / 1000)
+            totals["other"].append((event["dur"] - sum(parts.values())) / 1000)
+    if not totals["total"]:
+        return ["No retunes in the trace"]
+    count = len(totals["total"])
+    lines = [F"{count} retunes", F"  {'phase':<24} {'avg':>8} {'p50':>8} {'p95':>8}  ms"]
+    for key, values in totals.items():
+        values.sort()
+        lines.append(
+            F"  {key:<24} {sum(values) / count:>8.1f} {percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f}"
+            )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Summarize a trace recorded with --trace")
+    parser.add_argument("trace", help = "trace file (JSON lines)")
+    parser.add_argument("--chrome", metavar = "FILE", help = "also write it for chrome://tracing / Perfetto")
+    args = parser.parse_args()
+    events = read_trace(args.trace)
+    print("\n".join(endpoint_table(events)))
+    print()
+    print("\n".join(retune_breakdown(events)))
+    if args.chrome:
+        with open(args.chrome, "w") as f:
+            jconf.dump({"traceEvents": events}, f)
+
+
+if __name__ == '__main__':
+    main()
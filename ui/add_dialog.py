@@ -0,0 +1,77 @@
+# Form implementation generated from reading ui file 'add_dialog.ui'
+#
+# Created by: PyQt6 UI code generator 6.11.0
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic6 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+
+class Ui_Dialog(object):
+    def setupUi(self, Dialog):
+        Dialog.setObjectName("Dialog")
+        Dialog.resize(566, 220)
+        Dialog.setStyleSheet("")
+        self.buttonBox = QtWidgets.QDialogButtonBox(parent=Dialog)
+        self.buttonBox.setGeometry(QtCore.QRect(460, 140, 90, 67))
+        self.buttonBox.setStyleSheet("")
+        self.buttonBox.setOrientation(QtCore.Qt.Orientation.Vertical)
+        self.buttonBox.setStandardButtons(QtWidgets.QDialogButtonBox.StandardButton.Cancel|QtWidgets.QDialogButtonBox.StandardButton.Ok)
+        self.buttonBox.setObjectName("buttonBox")
+        self.groupBox_2 = QtWidgets.QGroupBox(parent=Dialog)
+        self.groupBox_2.setGeometry(QtCore.QRect(0, 0, 561, 129))
+        self.groupBox_2.setTitle("")
+        self.groupBox_2.setObjectName("groupBox_2")
+        self.gridLayout = QtWidgets.QGridLayout(self.groupBox_2)
+        self.gridLayout.setObjectName("gridLayout")
+        self.label_3 = QtWidgets.QLabel(parent=self.groupBox_2)
+        self.label_3.setStyleSheet("color: rgb(255, 255, 255);")
+        self.label_3.setObjectName("label_3")
+        self.gridLayout.addWidget(self.label_3, 2, 0, 1, 1)
+        self.label_2 = QtWidgets.QLabel(parent=self.groupBox_2)
+        self.label_2.setStyleSheet("color: rgb(255, 255, 255);")
+        self.label_2.setObjectName("label_2")
+        self.gridLayout.addWidget(self.label_2, 1, 0, 1, 1)
+        self.bandlineEdit = QtWidgets.QLineEdit(parent=self.groupBox_2)
+        self.bandlineEdit.setObjectName("bandlineEdit")
+        self.gridLayout.addWidget(self.bandlineEdit, 0, 1, 1, 1)
+        self.label = QtWidgets.QLabel(parent=self.groupBox_2)
+        self.label.setStyleSheet("color: rgb(255, 255, 255);")
+        self.label.setObjectName("label")
+        self.gridLayout.addWidget(self.label, 0, 0, 1, 1)
+        self.steplineEdit = QtWidgets.QLineEdit(parent=self.groupBox_2)
+        self.steplineEdit.setObjectName("steplineEdit")
+        self.gridLayout.addWidget(self.steplineEdit, 1, 1, 1, 1)
+        self.desclineEdit = QtWidgets.QLineEdit(parent=self.groupBox_2)
+        self.desclineEdit.setObjectName("desclineEdit")
+        self.gridLayout.addWidget(self.desclineEdit, 2, 1, 1, 1)
+        self.relay1checkBox = QtWidgets.QCheckBox(parent=Dialog)
+        self.relay1checkBox.setGeometry(QtCore.QRect(10, 140, 61, 26))
+        self.relay1checkBox.setObjectName("relay1checkBox")
+        self.relay2checkBox = QtWidgets.QCheckBox(parent=Dialog)
+        self.relay2checkBox.setGeometry(QtCore.QRect(100, 140, 71, 26))
+        self.relay2checkBox.setObjectName("relay2checkBox")
+        self.relay3checkBox = QtWidgets.QCheckBox(parent=Dialog)
+        self.relay3checkBox.setGeometry(QtCore.QRect(200, 140, 81, 26))
+        self.relay3checkBox.setObjectName("relay3checkBox")
+        self.relay4checkBox = QtWidgets.QCheckBox(parent=Dialog)
+        self.relay4checkBox.setGeometry(QtCore.QRect(300, 140, 61, 26))
+        self.relay4checkBox.setObjectName("relay4checkBox")
+
+        self.retranslateUi(Dialog)
+        self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
+        self.buttonBox.rejected.connect(Dialog.reject) # type: ignore
+        QtCore.QMetaObject.connectSlotsByName(Dialog)
+
+    def retranslateUi(self, Dialog):
+        _translate = QtCore.QCoreApplication.translate
+        Dialog.setWindowTitle(_translate("Dialog", "Dialog"))
+        self.label_3.setText(_translate("Dialog", "Опис"))
+        self.label_2.setText(_translate("Dialog", "Кроки"))
+        self.label.setText(_translate("Dialog", "Діапазон"))
+        self.relay1checkBox.setText(_translate("Dialog", "1"))
+        self.relay2checkBox.setText(_translate("Dialog", "2"))
+        self.relay3checkBox.setText(_translate("Dialog", "3"))
+        self.relay4checkBox.setText(_translate("Dialog", "4"))
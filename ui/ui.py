@@ -1,6 +1,6 @@
 # Form implementation generated from reading ui file 'ui.ui'
 #
-# Created by: PyQt6 UI code generator 6.3.1
+# Created by: PyQt6 UI code generator 6.11.0
 #
 # WARNING: Any manual changes made to this file will be lost when pyuic6 is
 # run again.  Do not edit this file unless you know what you are doing.
@@ -16,45 +16,54 @@ class Ui_MainWindow(object):
         MainWindow.setMinimumSize(QtCore.QSize(560, 680))
         MainWindow.setMaximumSize(QtCore.QSize(616, 680))
         MainWindow.setStyleSheet("")
-        self.centralwidget = QtWidgets.QWidget(MainWindow)
+        self.centralwidget = QtWidgets.QWidget(parent=MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.gridLayout_3 = QtWidgets.QGridLayout(self.centralwidget)
         self.gridLayout_3.setObjectName("gridLayout_3")
-        self.connect_groupBox = QtWidgets.QGroupBox(self.centralwidget)
+        self.connect_groupBox = QtWidgets.QGroupBox(parent=self.centralwidget)
         self.connect_groupBox.setMinimumSize(QtCore.QSize(0, 110))
         self.connect_groupBox.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.connect_groupBox.setObjectName("connect_groupBox")
         self.gridLayout_4 = QtWidgets.QGridLayout(self.connect_groupBox)
         self.gridLayout_4.setObjectName("gridLayout_4")
-        self.url_lineEdit = QtWidgets.QLineEdit(self.connect_groupBox)
+        self.device_label = QtWidgets.QLabel(parent=self.connect_groupBox)
+        self.device_label.setObjectName("device_label")
+        self.gridLayout_4.addWidget(self.device_label, 0, 0, 1, 1)
+        self.deviceComboBox = QtWidgets.QComboBox(parent=self.connect_groupBox)
+        self.deviceComboBox.setObjectName("deviceComboBox")
+        self.gridLayout_4.addWidget(self.deviceComboBox, 0, 1, 1, 1)
+        self.tuneAllCheckBox = QtWidgets.QCheckBox(parent=self.connect_groupBox)
+        self.tuneAllCheckBox.setObjectName("tuneAllCheckBox")
+        self.gridLayout_4.addWidget(self.tuneAllCheckBox, 0, 2, 1, 1)
+        self.url_lineEdit = QtWidgets.QLineEdit(parent=self.connect_groupBox)
         self.url_lineEdit.setText("")
         self.url_lineEdit.setObjectName("url_lineEdit")
         self.gridLayout_4.addWidget(self.url_lineEdit, 1, 1, 1, 1)
-        self.label_2 = QtWidgets.QLabel(self.connect_groupBox)
+        self.label_2 = QtWidgets.QLabel(parent=self.connect_groupBox)
         self.label_2.setObjectName("label_2")
         self.gridLayout_4.addWidget(self.label_2, 1, 0, 1, 1)
-        self.connectButton = QtWidgets.QPushButton(self.connect_groupBox)
+        self.connectButton = QtWidgets.QPushButton(parent=self.connect_groupBox)
         self.connectButton.setObjectName("connectButton")
         self.gridLayout_4.addWidget(self.connectButton, 1, 2, 1, 1)
-        self.autoConCheckBox = QtWidgets.QCheckBox(self.connect_groupBox)
+        self.autoConCheckBox = QtWidgets.QCheckBox(parent=self.connect_groupBox)
         self.autoConCheckBox.setObjectName("autoConCheckBox")
         self.gridLayout_4.addWidget(self.autoConCheckBox, 2, 2, 1, 1)
         self.gridLayout_3.addWidget(self.connect_groupBox, 2, 0, 1, 1)
-        self.manualGroup = QtWidgets.QGroupBox(self.centralwidget)
+        self.manualGroup = QtWidgets.QGroupBox(parent=self.centralwidget)
         self.manualGroup.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.manualGroup.setObjectName("manualGroup")
         self.gridLayout = QtWidgets.QGridLayout(self.manualGroup)
         self.gridLayout.setObjectName("gridLayout")
-        self.parkButton = QtWidgets.QPushButton(self.manualGroup)
+        self.parkButton = QtWidgets.QPushButton(parent=self.manualGroup)
         self.parkButton.setObjectName("parkButton")
         self.gridLayout.addWidget(self.parkButton, 0, 4, 1, 1)
-        self.upButton = QtWidgets.QPushButton(self.manualGroup)
+        self.upButton = QtWidgets.QPushButton(parent=self.manualGroup)
         self.upButton.setObjectName("upButton")
         self.gridLayout.addWidget(self.upButton, 0, 0, 1, 1)
-        self.relay2checkBox = QtWidgets.QCheckBox(self.manualGroup)
+        self.relay2checkBox = QtWidgets.QCheckBox(parent=self.manualGroup)
         self.relay2checkBox.setObjectName("relay2checkBox")
         self.gridLayout.addWidget(self.relay2checkBox, 6, 1, 1, 1)
-        self.step_comboBox = QtWidgets.QComboBox(self.manualGroup)
+        self.step_comboBox = QtWidgets.QComboBox(parent=self.manualGroup)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Preferred)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -63,32 +72,33 @@ class Ui_MainWindow(object):
         self.step_comboBox.setFrame(False)
         self.step_comboBox.setObjectName("step_comboBox")
         self.gridLayout.addWidget(self.step_comboBox, 0, 3, 1, 1)
-        self.label = QtWidgets.QLabel(self.manualGroup)
+        self.label = QtWidgets.QLabel(parent=self.manualGroup)
         self.label.setObjectName("label")
         self.gridLayout.addWidget(self.label, 5, 0, 1, 1)
-        self.steplabel = QtWidgets.QLabel(self.manualGroup)
+        self.steplabel = QtWidgets.QLabel(parent=self.manualGroup)
         self.steplabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight|QtCore.Qt.AlignmentFlag.AlignTrailing|QtCore.Qt.AlignmentFlag.AlignVCenter)
         self.steplabel.setObjectName("steplabel")
         self.gridLayout.addWidget(self.steplabel, 0, 2, 1, 1)
-        self.downButton = QtWidgets.QPushButton(self.manualGroup)
+        self.downButton = QtWidgets.QPushButton(parent=self.manualGroup)
         self.downButton.setObjectName("downButton")
         self.gridLayout.addWidget(self.downButton, 3, 0, 1, 1)
-        self.relay1checkBox = QtWidgets.QCheckBox(self.manualGroup)
+        self.relay1checkBox = QtWidgets.QCheckBox(parent=self.manualGroup)
         self.relay1checkBox.setObjectName("relay1checkBox")
         self.gridLayout.addWidget(self.relay1checkBox, 6, 0, 1, 1)
-        self.current_position_label = QtWidgets.QLabel(self.manualGroup)
+        self.current_position_label = QtWidgets.QLabel(parent=self.manualGroup)
         font = QtGui.QFont()
         font.setPointSize(10)
         font.setBold(True)
+        font.setWeight(75)
         self.current_position_label.setFont(font)
         self.current_position_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.current_position_label.setObjectName("current_position_label")
         self.gridLayout.addWidget(self.current_position_label, 5, 2, 1, 1)
-        self.speedlabel = QtWidgets.QLabel(self.manualGroup)
+        self.speedlabel = QtWidgets.QLabel(parent=self.manualGroup)
         self.speedlabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignRight|QtCore.Qt.AlignmentFlag.AlignTrailing|QtCore.Qt.AlignmentFlag.AlignVCenter)
         self.speedlabel.setObjectName("speedlabel")
         self.gridLayout.addWidget(self.speedlabel, 3, 2, 1, 1)
-        self.speed_comboBox = QtWidgets.QComboBox(self.manualGroup)
+        self.speed_comboBox = QtWidgets.QComboBox(parent=self.manualGroup)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Policy.Preferred, QtWidgets.QSizePolicy.Policy.Preferred)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -96,72 +106,90 @@ class Ui_MainWindow(object):
         self.speed_comboBox.setSizePolicy(sizePolicy)
         self.speed_comboBox.setObjectName("speed_comboBox")
         self.gridLayout.addWidget(self.speed_comboBox, 3, 3, 1, 1)
-        self.bandGroup = QtWidgets.QGroupBox(self.manualGroup)
+        self.bandGroup = QtWidgets.QGroupBox(parent=self.manualGroup)
         self.bandGroup.setMinimumSize(QtCore.QSize(0, 0))
         self.bandGroup.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.bandGroup.setObjectName("bandGroup")
         self.gridLayout_2 = QtWidgets.QGridLayout(self.bandGroup)
         self.gridLayout_2.setObjectName("gridLayout_2")
-        self.deleteButton = QtWidgets.QPushButton(self.bandGroup)
+        self.deleteButton = QtWidgets.QPushButton(parent=self.bandGroup)
         self.deleteButton.setObjectName("deleteButton")
         self.gridLayout_2.addWidget(self.deleteButton, 1, 2, 1, 1)
-        self.bandtreeView = QtWidgets.QTreeView(self.bandGroup)
+        self.bandtreeView = QtWidgets.QTreeView(parent=self.bandGroup)
         self.bandtreeView.setObjectName("bandtreeView")
         self.gridLayout_2.addWidget(self.bandtreeView, 0, 0, 1, 3)
-        self.runButton = QtWidgets.QPushButton(self.bandGroup)
+        self.runButton = QtWidgets.QPushButton(parent=self.bandGroup)
         self.runButton.setObjectName("runButton")
         self.gridLayout_2.addWidget(self.runButton, 1, 0, 1, 1)
-        self.addButton = QtWidgets.QPushButton(self.bandGroup)
+        self.addButton = QtWidgets.QPushButton(parent=self.bandGroup)
         self.addButton.setObjectName("addButton")
         self.gridLayout_2.addWidget(self.addButton, 1, 1, 1, 1)
+        self.freq_lineEdit = QtWidgets.QLineEdit(parent=self.bandGroup)
+        self.freq_lineEdit.setObjectName("freq_lineEdit")
+        self.gridLayout_2.addWidget(self.freq_lineEdit, 2, 0, 1, 2)
+        self.tuneButton = QtWidgets.QPushButton(parent=self.bandGroup)
+        self.tuneButton.setObjectName("tuneButton")
+        self.gridLayout_2.addWidget(self.tuneButton, 2, 2, 1, 1)
+        self.importButton = QtWidgets.QPushButton(parent=self.bandGroup)
+        self.importButton.setObjectName("importButton")
+        self.gridLayout_2.addWidget(self.importButton, 3, 0, 1, 1)
+        self.exportButton = QtWidgets.QPushButton(parent=self.bandGroup)
+        self.exportButton.setObjectName("exportButton")
+        self.gridLayout_2.addWidget(self.exportButton, 3, 1, 1, 1)
+        self.autotuneButton = QtWidgets.QPushButton(parent=self.bandGroup)
+        self.autotuneButton.setObjectName("autotuneButton")
+        self.gridLayout_2.addWidget(self.autotuneButton, 3, 2, 1, 1)
         self.gridLayout.addWidget(self.bandGroup, 7, 0, 1, 5)
-        self.relay4checkBox = QtWidgets.QCheckBox(self.manualGroup)
+        self.relay4checkBox = QtWidgets.QCheckBox(parent=self.manualGroup)
         self.relay4checkBox.setObjectName("relay4checkBox")
         self.gridLayout.addWidget(self.relay4checkBox, 6, 4, 1, 1)
-        self.relay3checkBox = QtWidgets.QCheckBox(self.manualGroup)
+        self.relay3checkBox = QtWidgets.QCheckBox(parent=self.manualGroup)
         self.relay3checkBox.setObjectName("relay3checkBox")
         self.gridLayout.addWidget(self.relay3checkBox, 6, 3, 1, 1)
         self.gridLayout_3.addWidget(self.manualGroup, 0, 0, 1, 1)
-        self.sensor_groupBox = QtWidgets.QGroupBox(self.centralwidget)
+        self.sensor_groupBox = QtWidgets.QGroupBox(parent=self.centralwidget)
         self.sensor_groupBox.setMinimumSize(QtCore.QSize(560, 70))
         self.sensor_groupBox.setMaximumSize(QtCore.QSize(540, 70))
         self.sensor_groupBox.setAlignment(QtCore.Qt.AlignmentFlag.AlignHCenter|QtCore.Qt.AlignmentFlag.AlignTop)
         self.sensor_groupBox.setFlat(True)
         self.sensor_groupBox.setCheckable(True)
         self.sensor_groupBox.setObjectName("sensor_groupBox")
-        self.horizontalLayout = QtWidgets.QHBoxLayout(self.sensor_groupBox)
+        self.sensorLayout = QtWidgets.QVBoxLayout(self.sensor_groupBox)
+        self.sensorLayout.setObjectName("sensorLayout")
+        self.horizontalLayout = QtWidgets.QHBoxLayout()
         self.horizontalLayout.setObjectName("horizontalLayout")
-        self.label_3 = QtWidgets.QLabel(self.sensor_groupBox)
+        self.label_3 = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.label_3.setObjectName("label_3")
         self.horizontalLayout.addWidget(self.label_3)
-        self.temperature_label = QtWidgets.QLabel(self.sensor_groupBox)
+        self.temperature_label = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.temperature_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.temperature_label.setObjectName("temperature_label")
         self.horizontalLayout.addWidget(self.temperature_label)
         spacerItem = QtWidgets.QSpacerItem(10, 40, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
         self.horizontalLayout.addItem(spacerItem)
-        self.label_5 = QtWidgets.QLabel(self.sensor_groupBox)
+        self.label_5 = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.label_5.setObjectName("label_5")
         self.horizontalLayout.addWidget(self.label_5)
-        self.humidity_label = QtWidgets.QLabel(self.sensor_groupBox)
+        self.humidity_label = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.humidity_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.humidity_label.setObjectName("humidity_label")
         self.horizontalLayout.addWidget(self.humidity_label)
         spacerItem1 = QtWidgets.QSpacerItem(10, 40, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.MinimumExpanding)
         self.horizontalLayout.addItem(spacerItem1)
-        self.label_4 = QtWidgets.QLabel(self.sensor_groupBox)
+        self.label_4 = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.label_4.setObjectName("label_4")
         self.horizontalLayout.addWidget(self.label_4)
-        self.pressure_label = QtWidgets.QLabel(self.sensor_groupBox)
+        self.pressure_label = QtWidgets.QLabel(parent=self.sensor_groupBox)
         self.pressure_label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
         self.pressure_label.setObjectName("pressure_label")
         self.horizontalLayout.addWidget(self.pressure_label)
+        self.sensorLayout.addLayout(self.horizontalLayout)
         self.gridLayout_3.addWidget(self.sensor_groupBox, 3, 0, 1, 1)
         MainWindow.setCentralWidget(self.centralwidget)
-        self.statusbar = QtWidgets.QStatusBar(MainWindow)
+        self.statusbar = QtWidgets.QStatusBar(parent=MainWindow)
         self.statusbar.setObjectName("statusbar")
         MainWindow.setStatusBar(self.statusbar)
-        self.action = QtGui.QAction(MainWindow)
+        self.action = QtGui.QAction(parent=MainWindow)
         self.action.setObjectName("action")
 
         self.retranslateUi(MainWindow)
@@ -171,6 +199,9 @@ class Ui_MainWindow(object):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "MagLoop Controller"))
         self.connect_groupBox.setTitle(_translate("MainWindow", "Підключення"))
+        self.device_label.setText(_translate("MainWindow", "Антена:"))
+        self.tuneAllCheckBox.setToolTip(_translate("MainWindow", "Налаштовувати всі антени одночасно"))
+        self.tuneAllCheckBox.setText(_translate("MainWindow", "Всі антени"))
         self.label_2.setText(_translate("MainWindow", "URL:"))
         self.connectButton.setText(_translate("MainWindow", "З\'єднати"))
         self.autoConCheckBox.setText(_translate("MainWindow", "Автоз\'єднання"))
@@ -188,6 +219,11 @@ class Ui_MainWindow(object):
         self.deleteButton.setText(_translate("MainWindow", "Видалити"))
         self.runButton.setText(_translate("MainWindow", "Виконати"))
         self.addButton.setText(_translate("MainWindow", "Додати"))
+        self.freq_lineEdit.setPlaceholderText(_translate("MainWindow", "Частота, МГц"))
+        self.tuneButton.setText(_translate("MainWindow", "Налаштувати"))
+        self.importButton.setText(_translate("MainWindow", "Імпорт"))
+        self.exportButton.setText(_translate("MainWindow", "Експорт"))
+        self.autotuneButton.setText(_translate("MainWindow", "Автоналаштування"))
         self.relay4checkBox.setText(_translate("MainWindow", "+Індуктивність"))
         self.relay3checkBox.setText(_translate("MainWindow", "+Ємність"))
         self.sensor_groupBox.setTitle(_translate("MainWindow", "Сенсори"))
@@ -0,0 +1,31 @@
+import importlib.util
+import io
+from pathlib import Path
+
+UI_DIR = Path(__file__).resolve().parent / "ui"
+
+
+def compile_ui(name: str) -> Path:
+    # Regenerates ui/<name>.py with pyuic when the .ui file is newer than the generated module
+    source = UI_DIR / F"{name}.ui"
+    target = UI_DIR / F"{name}.py"
+    if not target.exists() or source.stat().st_mtime > target.stat().st_mtime:
+        from PyQt6 import uic
+        # Keep the bare file name in the generated header, like running pyuic6 from ui/
+        ui_file = io.BytesIO(source.read_bytes())
+        ui_file.name = source.name
+        try:
+            with open(target, "w", encoding = "utf-8") as py_file:
+                uic.compileUi(ui_file, py_file)
+        except OSError:
+            if not target.exists():
+                raise
+    return target
+
+
+def load_form(name: str, class_name: str):
+    path = compile_ui(name)
+    spec = importlib.util.spec_from_file_location(F"ui_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)